@@ -1,80 +1,144 @@
 import discord
 from discord.ext import commands
-from my_logginng import db_log
 # import json
 # import datetime
 
-from database import get_users_info, get_balance, update_balance
+from database import get_users_page, search_users, get_balance, settle_game, USERS_PAGE_SIZE
+from user_executor import submit
+from leaderboard import invalidate_leaderboard
+from game_stats import stats_embed
     # get_all_banned_users, ban_user_management, get_user_ban_status
-
-# --- (keep your original UserDatabaseSelect if you like) ---
-class UserDatabaseSelect(discord.ui.Select):
-    def __init__(self, users: list[dict]):
-        options = [discord.SelectOption(label="All Users", value="all")]
-        for u in users[:24]:
-            username = u.get('username')[:100] if u.get('username') else f"User {u['user_id']}"
-            options.append(discord.SelectOption(label=username, value=str(u['user_id'])))
-        super().__init__(
-            placeholder="Select a user...",
-            min_values=1,
-            max_values=1,
-            options=options,
-            custom_id="admin_user_select"
-        )
-        self.users = users
-
-    async def callback(self, interaction: discord.Interaction):
-        if self.values[0] == "all":
-            users = await get_users_info()
-            if not users:
-                await interaction.response.send_message("No users found.", ephemeral=True)
-                return
-            msg = ""
-            for u in users:
-                msg += f"👤 {u.get('username','Unknown')[:100]} | 💰 {u['balance']} | 🧮 Total Bet: {u['total_bet']}\n"
-                if len(msg) > 1800:
-                    await interaction.followup.send(msg, ephemeral=True)
-                    msg = ""
-            if msg:
-                await interaction.response.send_message(msg, ephemeral=True)
-        else:
-            uid = int(self.values[0])
-            self.view.selected_user = uid
-            username = next((u.get('username','Unknown')[:100] for u in self.users if u['user_id'] == uid), "Unknown")
-            balance, total_bet = await get_balance(user_id=uid, admin=True)
-            # ban_info = await get_user_ban_status(uid)
-            msg = (
-                f"👤 **{username}**\n"
-                f"💰 Balance: {balance}\n"
-                f"🧮 Total Bet: {total_bet}"
-                # f"⛔ Banned: {ban_info['ban_status']}\n"
-                # f"🕒 Ban Time: {ban_info['ban_time']}\n"
-                # f"🎮 Banned Games: {', '.join(ban_info['banned_games']) if ban_info['banned_games'] else 'None'}"
-            )
-            await interaction.response.send_message(msg, ephemeral=True)
-
+from metrics import InstrumentedView, counted_edit, summary_embed
 
 # -----------------------
-# Balance flow (fixed)
+# User browser: keyset pages by balance plus username search
 # -----------------------
-class BalanceUserSelect(discord.ui.Select):
+def format_user_line(u: dict) -> str:
+    username = u.get('username')[:100] if u.get('username') else f"User {u['user_id']}"
+    return f"👤 {username} | 💰 {u['balance']} | 🧮 Total Bet: {u['total_bet']}"
+
+
+class UserPageSelect(discord.ui.Select):
     def __init__(self, users: list[dict]):
         options = [
-            discord.SelectOption(label=(u.get('username','User '+str(u['user_id']))[:100]), value=str(u['user_id']))
+            discord.SelectOption(
+                label=(u.get('username') or f"User {u['user_id']}")[:100],
+                description=f"💰 {u['balance']}",
+                value=str(u['user_id'])
+            )
             for u in users[:25]
         ]
-        super().__init__(placeholder="Select user...", min_values=1, max_values=1, options=options, custom_id="balance_user_select")
+        super().__init__(placeholder="Select a user...", min_values=1, max_values=1, options=options)
 
     async def callback(self, interaction: discord.Interaction):
-        # store selected_user in the parent view (the ephemeral view that showed this select)
-        self.view.selected_user = int(self.values[0])
+        await self.view.pick(interaction, int(self.values[0]))
+
+
+class UserSearchModal(discord.ui.Modal, title="Search Users"):
+    def __init__(self, browser):
+        super().__init__()
+        self.browser = browser
+        self.add_item(discord.ui.TextInput(label="Username starts with", max_length=100))
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await self.browser.show_search(interaction, self.children[0].value.strip())
+
+
+class UserBrowserView(InstrumentedView):
+    """
+    Browse accounts USERS_PAGE_SIZE at a time (keyset pagination on
+    (balance, user_id), so every page is one small index scan), or search by
+    username prefix. `purpose` decides what picking a user does: "info" shows
+    their account, "balance" starts the balance adjustment flow.
+    """
+    game = "admin_panel"
+
+    def __init__(self, purpose: str):
+        super().__init__(timeout=300)
+        self.purpose = purpose
+        self.users = []
+        self.has_prev = False
+        self.has_next = False
+        self.searching = False
+        self.select = None
+
+    async def load(self, after: tuple = None, before: tuple = None):
+        rows = await get_users_page(after=after, before=before)
+        self.searching = False
+        more = len(rows) > USERS_PAGE_SIZE
+        if before is not None:
+            # Fetched backwards: the extra row is the first one
+            self.users = rows[-USERS_PAGE_SIZE:]
+            self.has_prev, self.has_next = more, True
+        else:
+            self.users = rows[:USERS_PAGE_SIZE]
+            self.has_prev, self.has_next = after is not None, more
+        self.refresh_items()
 
-        # create a new BalanceTypeView but pass the selected_user to it
-        next_view = BalanceTypeView()
-        next_view.selected_user = self.view.selected_user
-        await interaction.response.send_message("Select type to adjust:", view=next_view, ephemeral=True)
+    def refresh_items(self):
+        if self.select is not None:
+            self.remove_item(self.select)
+            self.select = None
+        if self.users:
+            self.select = UserPageSelect(self.users)
+            self.add_item(self.select)
+        self.prev_page.disabled = not self.has_prev
+        self.next_page.disabled = not self.has_next
+
+    def render(self, title: str = None) -> str:
+        if not self.users:
+            return "No users found."
+        if title is None:
+            title = "Select a user to adjust balance/total bet" if self.purpose == "balance" else "Users by balance"
+        return f"**{title}**\n" + "\n".join(format_user_line(u) for u in self.users)
+
+    async def pick(self, interaction: discord.Interaction, uid: int):
+        if self.purpose == "balance":
+            next_view = BalanceTypeView()
+            next_view.selected_user = uid
+            await interaction.response.send_message("Select type to adjust:", view=next_view, ephemeral=True)
+            return
+
+        username = next((u.get('username') or "Unknown" for u in self.users if u['user_id'] == uid), "Unknown")
+        balance, total_bet = await get_balance(user_id=uid, admin=True)
+        msg = (
+            f"👤 **{username[:100]}**\n"
+            f"💰 Balance: {balance}\n"
+            f"🧮 Total Bet: {total_bet}"
+        )
+        await interaction.response.send_message(msg, ephemeral=True)
+
+    async def show_search(self, interaction: discord.Interaction, prefix: str):
+        self.users = await search_users(prefix) if prefix else []
+        self.searching = True
+        # Prev goes back to the first balance page
+        self.has_prev, self.has_next = True, False
+        self.refresh_items()
+        await counted_edit(interaction.response.edit_message(content=self.render(f"Users starting with \"{prefix}\""), view=self))
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary, row=1)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.searching or not self.users:
+            await self.load()
+        else:
+            first = self.users[0]
+            await self.load(before=(first['balance'], first['user_id']))
+        await counted_edit(interaction.response.edit_message(content=self.render(), view=self))
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary, row=1)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        last = self.users[-1]
+        await self.load(after=(last['balance'], last['user_id']))
+        await counted_edit(interaction.response.edit_message(content=self.render(), view=self))
+
+    @discord.ui.button(label="🔍 Search", style=discord.ButtonStyle.primary, row=1)
+    async def search(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(UserSearchModal(self))
 
 
+# -----------------------
+# Balance flow (fixed)
+# -----------------------
 class BalanceTypeSelect(discord.ui.Select):
     def __init__(self):
         options = [
@@ -125,35 +189,31 @@ class BalanceAmountModal(discord.ui.Modal, title="Enter Amount"):
         except ValueError:
             await interaction.response.send_message("Invalid number.", ephemeral=True)
             return
-        if self.adjust_type == "balance":
-            await update_balance(self.user_id, amount, 0)
-        else:
-            await update_balance(self.user_id, 0, amount)
-        # Log the admin action
-        bal, bet = await get_balance(user_id=self.user_id, admin=True)
-        await db_log(
-            user_id=self.user_id,
-            username="NULL",
-            source="admin_panel",
-            action=self.operation,
-            bet_amount=0,
-            delta=amount,
-            balance_after=bal,
-            total_bet_after=bet,
+        # Through the user's queue, so it can't interleave with a game step;
+        # settle_game logs the change with the balance it produced
+        await submit(
+            self.user_id, settle_game,
+            self.user_id, "NULL", "admin_panel", self.operation,
+            amount if self.adjust_type == "balance" else 0,
+            total_bet_delta=0 if self.adjust_type == "balance" else abs(amount),
             metadata={
                 "admin_id": interaction.user.id,
                 "admin_name": interaction.user.name,
                 "adjust_type": self.adjust_type,
                 "operation": self.operation,
                 "amount": amount
-            }
+            },
+            clamp=True
         )
+        invalidate_leaderboard()
         await interaction.response.send_message(
             f"✅ Updated <@{self.user_id}>: {self.adjust_type} {'added' if amount>0 else 'removed'} {abs(amount)}", ephemeral=True
         )
 
 
-class BalanceTypeView(discord.ui.View):
+class BalanceTypeView(InstrumentedView):
+    game = "admin_panel"
+
     def __init__(self):
         super().__init__()
         self.selected_user = None
@@ -162,7 +222,9 @@ class BalanceTypeView(discord.ui.View):
         self.add_item(BalanceTypeSelect())
 
 
-class BalanceOperationView(discord.ui.View):
+class BalanceOperationView(InstrumentedView):
+    game = "admin_panel"
+
     def __init__(self):
         super().__init__()
         self.selected_user = None
@@ -173,27 +235,31 @@ class BalanceOperationView(discord.ui.View):
 # -----------------------
 # AdminView: hook up the new flows
 # -----------------------
-class AdminView(discord.ui.View):
-    def __init__(self, users: list[dict] = None, games: list[str] = None):
+class AdminView(InstrumentedView):
+    game = "admin_panel"
+
+    def __init__(self, games: list[str] = None):
         super().__init__(timeout=None)
-        self.users = users or []
         self.games = games or []
         self.selected_user = None
         self.selected_game = None
 
     @discord.ui.button(label="Show Users", style=discord.ButtonStyle.primary, custom_id='show_users', row=1)
     async def show_user_dropdown(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not self.users:
-            self.users = await get_users_info()
-        view = discord.ui.View()
-        view.add_item(UserDatabaseSelect(self.users))
-        await interaction.response.send_message("Choose a user:", view=view, ephemeral=True)
+        view = UserBrowserView("info")
+        await view.load()
+        await interaction.response.send_message(view.render(), view=view, ephemeral=True)
 
     @discord.ui.button(label="Manage Balance", style=discord.ButtonStyle.primary, custom_id='manage_balance', row=1)
     async def manage_balance(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if not self.users:
-            self.users = await get_users_info()
-        view = discord.ui.View()
-        # we will use the BalanceUserSelect to begin the flow
-        view.add_item(BalanceUserSelect(self.users))
-        await interaction.response.send_message("Select a user to adjust balance/total bet:", view=view, ephemeral=True)
\ No newline at end of file
+        view = UserBrowserView("balance")
+        await view.load()
+        await interaction.response.send_message(view.render(), view=view, ephemeral=True)
+
+    @discord.ui.button(label="Statistics", style=discord.ButtonStyle.secondary, custom_id='show_stats', row=1)
+    async def show_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_message(embed=await stats_embed(), ephemeral=True)
+
+    @discord.ui.button(label="Metrics", style=discord.ButtonStyle.secondary, custom_id='show_metrics', row=1)
+    async def show_metrics(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_message(embed=summary_embed(), ephemeral=True)
@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+import traceback
+
+import aiohttp
+import discord
+
+import metrics
+
+# --- Alerts ---
+# Crash and error reports go to the DISCORD_WEBHOOK_ALERT webhook from a
+# background task, so reporting never blocks the event loop. notify() only
+# enqueues: the bounded queue drops alerts when it's full, the sender is rate
+# limited, repeats of the same traceback are coalesced into one message with
+# a count, and failed sends are retried with exponential backoff.
+
+WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_ALERT")
+PING_UID = os.getenv("MY_DISCORD_UID")
+
+ALERT_QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "100"))
+ALERT_BURST = int(os.getenv("ALERT_BURST", "5"))  # alerts sent back to back before the rate limit applies
+ALERT_INTERVAL = float(os.getenv("ALERT_INTERVAL", "12"))  # seconds per alert after a burst
+ALERT_COALESCE_WINDOW = float(os.getenv("ALERT_COALESCE_WINDOW", "600"))  # seconds a traceback stays "seen"
+ALERT_MAX_RETRIES = 5
+ALERT_BACKOFF_MAX = 60.0  # seconds
+ALERT_DRAIN_TIMEOUT = 5.0  # seconds stop_alerts() waits for queued alerts
+
+MESSAGE_LIMIT = 2000  # Discord's content limit
+
+_alert_queue = None
+_sender_task = None
+_own_session = None  # the webhook's own HTTP session, independent of the bot's
+_STOP = object()
+
+# fingerprint -> queued _Alert, so repeats fold into it before it's sent
+_queued = {}
+# fingerprint -> [last sent (monotonic), repeats suppressed since, the alert]
+_recent = {}
+
+alert_stats = {
+    "queued": 0,
+    "sent": 0,
+    "coalesced": 0,
+    "dropped": 0,
+    "retries": 0,
+    "failed": 0,
+}
+
+class _Alert:
+    __slots__ = ("title", "message", "fingerprint", "count")
+
+    def __init__(self, title: str, message: str, fingerprint: str):
+        self.title = title
+        self.message = message
+        self.fingerprint = fingerprint
+        self.count = 1
+
+_ADDRESSES = re.compile(r"0x[0-9a-fA-F]+")
+
+def fingerprint(title: str, message: str) -> str:
+    """Same title and text, ignoring object addresses, means the same alert."""
+    return hashlib.sha1(f"{title}\n{_ADDRESSES.sub('0x?', message)}".encode()).hexdigest()
+
+def alert_queue_depth() -> int:
+    return _alert_queue.qsize() if _alert_queue is not None else 0
+
+def get_alert_stats() -> dict:
+    stats = dict(alert_stats)
+    stats["queue_depth"] = alert_queue_depth()
+    return stats
+
+metrics.register_gauge("casino_alert_queue_depth", "Alerts waiting to be sent", alert_queue_depth)
+
+def _enqueue(alert: "_Alert") -> bool:
+    try:
+        _alert_queue.put_nowait(alert)
+    except asyncio.QueueFull:
+        alert_stats["dropped"] += 1
+        return False
+    _queued[alert.fingerprint] = alert
+    alert_stats["queued"] += 1
+    return True
+
+def notify(title: str, message: str) -> bool:
+    """Queue an alert without waiting. Returns False if it was dropped."""
+    if not WEBHOOK_URL:
+        return False
+    if _alert_queue is None:
+        print(f"Alerts not started; not sent: {title}", flush=True)
+        return False
+
+    key = fingerprint(title, message)
+    queued = _queued.get(key)
+    if queued is not None:
+        queued.count += 1
+        alert_stats["coalesced"] += 1
+        return True
+    recent = _recent.get(key)
+    if recent is not None and time.monotonic() - recent[0] < ALERT_COALESCE_WINDOW:
+        recent[1] += 1
+        alert_stats["coalesced"] += 1
+        return True
+
+    return _enqueue(_Alert(title, message, key))
+
+def notify_exception(title: str, error: BaseException) -> bool:
+    return notify(title, "".join(traceback.format_exception(error)))
+
+# --- Error hooks ---
+
+class _DiscordErrorHandler(logging.Handler):
+    """
+    discord.py reports unhandled errors from events (Client.on_error), app
+    commands (CommandTree.on_error) and view callbacks (View.on_error) by
+    logging them with the exception attached; forward those.
+    """
+    def emit(self, record: logging.LogRecord):
+        # Don't alert about failing to send alerts
+        if record.exc_info is None or record.name.startswith("discord.webhook"):
+            return
+        notify(record.getMessage(), "".join(traceback.format_exception(*record.exc_info)))
+
+def _loop_exception_handler(loop, context):
+    loop.default_exception_handler(context)
+    error = context.get("exception")
+    if error is not None:
+        notify(context.get("message", "Unhandled exception in task"), "".join(traceback.format_exception(error)))
+
+def install_error_hooks():
+    logger = logging.getLogger("discord")
+    if not any(isinstance(h, _DiscordErrorHandler) for h in logger.handlers):
+        logger.addHandler(_DiscordErrorHandler(level=logging.ERROR))
+    asyncio.get_running_loop().set_exception_handler(_loop_exception_handler)
+
+# --- Sender ---
+
+def _webhook() -> discord.Webhook:
+    global _own_session
+    if _own_session is None or _own_session.closed:
+        _own_session = aiohttp.ClientSession()
+    return discord.Webhook.from_url(WEBHOOK_URL, session=_own_session)
+
+def _format(alert: _Alert, suppressed: int) -> str:
+    title = alert.title
+    repeats = alert.count - 1 + suppressed
+    if repeats:
+        title += f" (+{repeats} more like it)"
+    header = f"<@{PING_UID}> 🚨 **{title}**\n" if PING_UID else f"🚨 **{title}**\n"
+    room = MESSAGE_LIMIT - len(header) - len("```\n```")
+    body = alert.message if len(alert.message) <= room else "…" + alert.message[-(room - 1):]  # the end says most
+    return f"{header}```\n{body}```"
+
+async def _send(alert: _Alert, suppressed: int):
+    content = _format(alert, suppressed)
+    for attempt in range(ALERT_MAX_RETRIES + 1):
+        try:
+            await _webhook().send(content, allowed_mentions=discord.AllowedMentions(users=True))
+            alert_stats["sent"] += 1
+            return
+        except discord.HTTPException as e:
+            if e.status < 500 and e.status != 429:
+                break  # bad webhook URL or payload; retrying won't help
+            error = e
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = e
+        if attempt == ALERT_MAX_RETRIES:
+            break
+        alert_stats["retries"] += 1
+        delay = min(2 ** attempt, ALERT_BACKOFF_MAX)
+        print(f"Alert send failed ({error}); retrying in {delay}s", flush=True)
+        await asyncio.sleep(delay)
+    alert_stats["failed"] += 1
+    print(f"Alert dropped after {attempt + 1} attempt(s): {alert.title}", flush=True)
+
+def _expire_recent():
+    """Forget fingerprints that left the window, first queueing a summary of any repeats they held back."""
+    cutoff = time.monotonic() - ALERT_COALESCE_WINDOW
+    for key, (sent, suppressed, alert) in list(_recent.items()):
+        if sent >= cutoff:
+            continue
+        del _recent[key]
+        if suppressed and key not in _queued:
+            summary = _Alert(alert.title, alert.message, key)
+            summary.count = suppressed
+            _enqueue(summary)
+
+async def _alert_sender():
+    tokens = float(ALERT_BURST)
+    refilled = time.monotonic()
+    while True:
+        try:
+            alert = await asyncio.wait_for(_alert_queue.get(), ALERT_COALESCE_WINDOW / 4)
+        except asyncio.TimeoutError:
+            _expire_recent()
+            continue
+        if alert is _STOP:
+            return
+
+        # Token bucket: ALERT_BURST at once, then one per ALERT_INTERVAL
+        now = time.monotonic()
+        tokens = min(ALERT_BURST, tokens + (now - refilled) / ALERT_INTERVAL)
+        refilled = now
+        if tokens < 1:
+            await asyncio.sleep((1 - tokens) * ALERT_INTERVAL)
+            tokens, refilled = 1.0, time.monotonic()
+        tokens -= 1
+
+        # From here on, repeats count towards the next alert instead of this one
+        _queued.pop(alert.fingerprint, None)
+        recent = _recent.get(alert.fingerprint)
+        suppressed = recent[1] if recent is not None else 0
+        _recent[alert.fingerprint] = [time.monotonic(), 0, alert]
+        try:
+            await _send(alert, suppressed)
+        except Exception as e:
+            alert_stats["failed"] += 1
+            print(f"Alert send failed: {e}", flush=True)
+        _expire_recent()
+
+def start_alerts():
+    """Start the sender and the error hooks. Safe to call more than once."""
+    global _alert_queue, _sender_task
+    install_error_hooks()
+    if _sender_task is not None and not _sender_task.done():
+        return
+    if not WEBHOOK_URL:
+        print("DISCORD_WEBHOOK_ALERT not set; alerts are disabled", flush=True)
+    _alert_queue = asyncio.Queue(maxsize=ALERT_QUEUE_SIZE)
+    _sender_task = asyncio.create_task(_alert_sender())
+
+async def stop_alerts(timeout: float = ALERT_DRAIN_TIMEOUT):
+    """Send what's queued (up to `timeout` seconds), then stop. Call before the client closes."""
+    global _alert_queue, _sender_task, _own_session
+    if _sender_task is not None and not _sender_task.done():
+        # The queue may be full; the sentinel must still get in
+        while True:
+            try:
+                _alert_queue.put_nowait(_STOP)
+                break
+            except asyncio.QueueFull:
+                dropped = _alert_queue.get_nowait()
+                if dropped is not _STOP:
+                    # Otherwise repeats would keep folding into an alert that's gone
+                    _queued.pop(dropped.fingerprint, None)
+                alert_stats["dropped"] += 1
+        try:
+            await asyncio.wait_for(_sender_task, timeout)
+        except asyncio.TimeoutError:
+            print(f"Alerts: gave up on {alert_queue_depth()} unsent alert(s)", flush=True)
+    _sender_task = None
+    _alert_queue = None
+    _queued.clear()
+    _recent.clear()
+    if _own_session is not None:
+        await _own_session.close()
+        _own_session = None
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+from itertools import accumulate
+
+import metrics
+
+# --- Frame-budgeted animations ---
+# Every frame of a spin is a message edit, and Discord rate limits edits per
+# message. An animation is described as a schedule (when each frame is due);
+# play() sends at most max_fps frames per second, drops intermediate frames
+# when it falls behind, and always sends the final frame.
+
+ANIMATION_MAX_FPS = float(os.getenv("ANIMATION_MAX_FPS", "2"))
+
+animation_stats = {
+    "animations": 0,
+    "frames_sent": 0,
+    "frames_dropped": 0,
+}
+
+metrics.register_gauge("casino_animations", "Animations played since start", lambda: animation_stats["animations"])
+metrics.register_gauge("casino_animation_frames_sent", "Animation frames sent as message edits since start", lambda: animation_stats["frames_sent"])
+metrics.register_gauge("casino_animation_frames_dropped", "Animation frames skipped by the frame budget since start", lambda: animation_stats["frames_dropped"])
+
+def schedule_from_delays(delays) -> list[float]:
+    """Turn per-frame delays into due times (seconds from the start)."""
+    return list(accumulate(delays))
+
+def ease_out_schedule(frames: int, duration: float, base: float = 0.05, power: float = 3) -> list[float]:
+    """Due times for `frames` frames over `duration` seconds, slowing down towards the end."""
+    if frames <= 1:
+        return [duration] * frames
+    delays = [base + (i / (frames - 1)) ** power for i in range(frames)]
+    scale = duration / sum(delays)
+    return schedule_from_delays(d * scale for d in delays)
+
+def plan_keyframes(schedule: list[float], max_fps: float = ANIMATION_MAX_FPS) -> list[int]:
+    """
+    Pick the frames worth sending: consecutive keyframes are at least
+    1/max_fps apart. The final frame is always included.
+    """
+    if not schedule:
+        return []
+    min_gap = 1 / max_fps if max_fps > 0 else 0
+    last = len(schedule) - 1
+    keyframes = []
+    last_due = None
+    for i, due in enumerate(schedule[:-1]):
+        if last_due is None or due - last_due >= min_gap:
+            # Keep room for the final frame
+            if schedule[last] - due < min_gap:
+                break
+            keyframes.append(i)
+            last_due = due
+    keyframes.append(last)
+    return keyframes
+
+async def play(send_frame, schedule: list[float], *, max_fps: float = ANIMATION_MAX_FPS):
+    """
+    Play an animation. send_frame(i) renders and sends frame i; it is only
+    called for frames that are actually sent. Frames whose successor is already
+    due when they come up are dropped, so a slow edit doesn't delay the ending.
+    """
+    keyframes = plan_keyframes(schedule, max_fps)
+    animation_stats["animations"] += 1
+    animation_stats["frames_dropped"] += len(schedule) - len(keyframes)
+
+    start = time.monotonic()
+    k = 0
+    while k < len(keyframes):
+        elapsed = time.monotonic() - start
+        # Behind schedule: jump to the latest keyframe that is already due
+        skip_to = k
+        while skip_to + 1 < len(keyframes) and schedule[keyframes[skip_to + 1]] <= elapsed:
+            skip_to += 1
+        animation_stats["frames_dropped"] += skip_to - k
+        k = skip_to
+
+        frame = keyframes[k]
+        wait = schedule[frame] - elapsed
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await send_frame(frame)
+        animation_stats["frames_sent"] += 1
+        k += 1
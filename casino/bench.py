@@ -0,0 +1,275 @@
+"""
+Microbenchmarks for the per-interaction game logic.
+
+Times the pure functions every click goes through (hand values and labels,
+wheel frames, reel draws, leaderboard and blackjack embeds) and compares
+them with a saved baseline, so an optimization can be measured and a
+regression caught before it ships:
+
+    python bench.py --save                 # record bench_baseline.json
+    python bench.py                        # compare; exit 1 if anything is >10% slower
+                                           # than the baseline or than its /uncached version
+    python bench.py --threshold 0.25 --filter hand
+
+Baselines are only comparable on the same machine and Python version.
+No Discord connection or database is needed.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from itertools import count
+from pathlib import Path
+
+import discord
+
+from card_engine import Shoe, Hand, hand_value, format_hand
+from slot_tables import SLOT_SYMBOLS, spin_payout
+from wheel_of_fortune import embed_wheel, round_up_to_50, wheel_of_fortune, wheel_frame
+from leaderboard import build_leaderboard_embed
+from blackjack import hand_embed
+
+BASELINE_PATH = Path(__file__).resolve().parent / "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.10  # fail when the best run is this much slower than the baseline
+TARGET_RUN_SECONDS = 0.02  # each timed run loops the benchmark for about this long
+
+BENCHMARKS = {}
+
+def benchmark(name: str):
+    """Register a zero-argument callable that does one unit of work."""
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+# Each entry is a setup function returning the callable to time, so inputs
+# are built once and outside the measurement.
+
+_rng = random.Random(1234)
+_shoe = Shoe(decks=6, rng=_rng)
+
+def _deal(n: int) -> tuple:
+    _shoe.start_round()
+    return tuple(_shoe.draw() for _ in range(n))
+
+@benchmark("hand_value/ids")
+def _():
+    hands = [_deal(3) for _ in range(64)]
+    it = count()
+    return lambda: hand_value(hands[next(it) & 63])
+
+@benchmark("hand_value/hand")
+def _():
+    hands = [Hand(_deal(3)) for _ in range(64)]
+    it = count()
+    return lambda: hand_value(hands[next(it) & 63])
+
+@benchmark("format_hand")
+def _():
+    hands = [Hand(_deal(4)) for _ in range(64)]
+    it = count()
+    return lambda: format_hand(hands[next(it) & 63])
+
+@benchmark("format_hand/hidden")
+def _():
+    hands = [Hand(_deal(2)) for _ in range(64)]
+    it = count()
+    return lambda: format_hand(hands[next(it) & 63], hide_second_card=True)
+
+@benchmark("embed_wheel")
+def _():
+    it = count()
+    return lambda: embed_wheel(next(it))
+
+@benchmark("embed_wheel/uncached")
+def _():
+    # Builds the frame text every time: embed_wheel's cached text must beat this
+    it = count()
+    def render():
+        i = next(it) % len(wheel_of_fortune)
+        return discord.Embed(title="Wheel of Fortune 🎯", description=wheel_frame(i), color=0xFFD700)
+    return render
+
+@benchmark("round_up_to_50")
+def _():
+    values = [_rng.randint(-30000, 30000) * 17 // 100 for _ in range(64)]
+    it = count()
+    return lambda: round_up_to_50(values[next(it) & 63])
+
+@benchmark("slots/draw_and_payout")
+def _():
+    choice = random.choice
+    def spin():
+        reels = [choice(SLOT_SYMBOLS) for _ in range(3)]
+        return spin_payout(reels, 100)
+    return spin
+
+@benchmark("leaderboard_embed")
+def _():
+    rows = [{"user_id": i, "username": f"player_{i}", "balance": 100000 - i * 731} for i in range(5)]
+    return lambda: build_leaderboard_embed(rows, 42)
+
+def _table() -> tuple:
+    """A freshly dealt table, so repeated inputs can't make a cache look good."""
+    _shoe.start_round()
+    player, dealer = Hand([_shoe.draw(), _shoe.draw()]), Hand([_shoe.draw(), _shoe.draw()])
+    if _rng.random() < 0.5:
+        player.add(_shoe.draw())
+    return player.key(), dealer.key()
+
+# Each hand benchmark deals a new table per call; blackjack/deal is that share.
+@benchmark("blackjack/deal")
+def _():
+    return _table
+
+@benchmark("blackjack/update_embed")
+def _():
+    # BlackjackView.update_embed: dealer hidden
+    color = discord.Color.blurple()
+    def render():
+        player, dealer = _table()
+        return hand_embed(player, dealer, False, color, None)
+    return render
+
+@benchmark("blackjack/end_game")
+def _():
+    # BlackjackView.end_game: dealer revealed with a result footer
+    colors = (discord.Color.green(), discord.Color.red())
+    it = count()
+    def render():
+        i = next(it)
+        player, dealer = _table()
+        return hand_embed(player, dealer, True, colors[i & 1], f"🎉 You win! +{50 * (i & 7)}")
+    return render
+
+@benchmark("embed/to_dict")
+def _():
+    # What discord.py serializes for every edit
+    player, dealer = _table()
+    embed = hand_embed(player, dealer, True, discord.Color.blurple(), "Hit or Stand?")
+    return embed.to_dict
+
+# --- Runner ---
+
+def _calibrate(fn) -> int:
+    """Loops per run so that one run takes about TARGET_RUN_SECONDS."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= TARGET_RUN_SECONDS / 10:
+            return max(1, int(loops * TARGET_RUN_SECONDS / elapsed))
+        loops *= 10
+
+def measure(fn, repeat: int) -> dict:
+    """
+    Time `repeat` runs with the collector off, like timeit. Comparisons use
+    the fastest run: noise from other processes only ever adds time.
+    """
+    loops = _calibrate(fn)
+    runs = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            runs.append((time.perf_counter() - start) / loops * 1e9)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_ns": statistics.median(runs),
+        "min_ns": min(runs),
+        "stdev_ns": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "node": platform.node(),
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print the comparison and return the names that regressed past `threshold`."""
+    regressed = []
+    print(f"{'benchmark':<32} {'baseline':>11} {'now':>11} {'change':>8}")
+    for name, result in results.items():
+        old = baseline["results"].get(name)
+        now = result["min_ns"]
+        if old is None:
+            print(f"{name:<32} {'-':>11} {now:>9.0f}ns {'new':>8}")
+            continue
+        change = now / old["min_ns"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  ❌ slower"
+            regressed.append(name)
+        elif change < -threshold:
+            flag = "  ✅ faster"
+        print(f"{name:<32} {old['min_ns']:>9.0f}ns {now:>9.0f}ns {change:>+8.1%}{flag}")
+    return regressed
+
+def compare_uncached(results: dict, threshold: float) -> list[str]:
+    """
+    Check each cached benchmark against its "<name>/uncached" counterpart
+    from the same run (only where a cache exists); a cached path slower than
+    building from scratch counts as a regression even with no baseline.
+    """
+    regressed = []
+    for name, result in results.items():
+        uncached = results.get(f"{name}/uncached")
+        if uncached is None:
+            continue
+        change = result["min_ns"] / uncached["min_ns"] - 1
+        if change > threshold:
+            print(f"❌ {name} is {change:.0%} slower than {name}/uncached")
+            regressed.append(name)
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the game logic hot paths")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown (0.10 = 10%%)")
+    parser.add_argument("--repeat", type=int, default=40, help="timed runs per benchmark")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter is None or args.filter in name]
+    results = {}
+    for name in names:
+        r = results[name] = measure(BENCHMARKS[name](), args.repeat)
+        print(f"{name:<32} {r['min_ns']:>9.0f}ns  (median {r['median_ns']:.0f}ns, ±{r['stdev_ns']:.0f}ns, {r['loops']} loops)", flush=True)
+
+    print()
+    regressed = compare_uncached(results, args.threshold)
+
+    if args.save:
+        args.baseline.write_text(json.dumps({"environment": environment(), "results": results}, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+    elif not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save first")
+    else:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("environment") != environment():
+            print(f"⚠️ Baseline was recorded on {baseline.get('environment')}; numbers may not be comparable\n")
+        regressed += compare(results, baseline, args.threshold)
+
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,165 +1,156 @@
-from my_logginng import db_log
 import discord
-import random
 import asyncio
-from database import get_balance, update_balance, get_user_lock
-
-CARD_VALUES = {
-    "A": 11, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6,
-    "7": 7, "8": 8, "9": 9, "10": 10, "J": 10, "Q": 10, "K": 10
-}
-SUITS = ["♠", "♥", "♦", "♣"]
-CARDS = [f"{rank}{suit}" for rank in CARD_VALUES for suit in SUITS]
-active_blackjack_tables = set()
-
-def draw_card():
-    return random.choice(CARDS)
-
-def hand_value(hand):
-    value = sum(CARD_VALUES[c[:-1]] for c in hand)
-    aces = sum(1 for c in hand if c.startswith("A"))
-    while value > 21 and aces:
-        value -= 10
-        aces -= 1
-    return value
-
-def format_hand(hand, hide_second_card=False):
-    if hide_second_card and len(hand) > 1:
-        return f"{hand[0]} | ❓"
-    return " | ".join(hand)
-
-class BlackjackView(discord.ui.View):
-    def __init__(self, uid, bet):
+from database import get_balance, settle_game
+from user_executor import submit
+from coordination import get_coordinator
+from metrics import InstrumentedView, counted_edit
+from card_engine import (
+    Shoe, Hand, hand_value, format_hand, dealer_draws, round_outcome, round_delta,
+    BLACKJACK_DECKS, BLACKJACK_PENETRATION, BONUS_21_MULTIPLIER
+)
+
+BLACKJACK_SESSION_TTL = 900  # seconds; only matters if a process dies mid-game
+
+# One shoe shared by every table in this process
+shoe = Shoe(decks=BLACKJACK_DECKS, penetration=BLACKJACK_PENETRATION)
+
+def hand_embed(player_hand: tuple, dealer_hand: tuple, reveal_dealer: bool, color: discord.Color, footer: str = None):
+    embed = discord.Embed(title="🃏 Blackjack", color=color)
+    embed.add_field(name="Your Hand", value=f"{format_hand(player_hand)}\n({hand_value(player_hand)})", inline=False)
+    embed.add_field(
+        name="Dealer's Hand",
+        value=f"{format_hand(dealer_hand, hide_second_card=not reveal_dealer)}\n({hand_value(dealer_hand) if reveal_dealer else '?'})",
+        inline=False
+    )
+    if footer:
+        embed.set_footer(text=footer)
+    return embed
+
+class BlackjackView(InstrumentedView):
+    game = "blackjack"
+
+    def __init__(self, uid, bet, username="Unknown"):
         super().__init__(timeout=60)
         self.uid = uid
+        self.username = username
         self.bet = bet
-        self.player_hand = [draw_card(), draw_card()]
-        self.dealer_hand = [draw_card(), draw_card()]
+        shoe.start_round()
+        self.player_hand = Hand([shoe.draw(), shoe.draw()])
+        self.dealer_hand = Hand([shoe.draw(), shoe.draw()])
         self.game_over = False
 
         self.message = None
 
     async def on_timeout(self):
-        active_blackjack_tables.discard(self.uid)
+        await get_coordinator().release_session("blackjack", self.uid)
 
     async def disable_all_items(self):
         for item in self.children:
             item.disabled = True
         if self.message:
-            await self.message.edit(view=self)
+            await counted_edit(self.message.edit(view=self))
 
     async def update_embed(self, interaction=None, *, footer=None, color=discord.Color.blurple(), reveal_dealer=False):
-        embed = discord.Embed(title="🃏 Blackjack", color=color)
-        embed.add_field(name="Your Hand", value=f"{format_hand(self.player_hand)}\n({hand_value(self.player_hand)})", inline=False)
-        embed.add_field(
-            name="Dealer's Hand",
-            value=f"{format_hand(self.dealer_hand, hide_second_card=not reveal_dealer)}\n({hand_value(self.dealer_hand) if reveal_dealer else '?'})",
-            inline=False
-        )
-        if footer:
-            embed.set_footer(text=footer)
-    
+        embed = hand_embed(self.player_hand.key(), self.dealer_hand.key(), reveal_dealer, color, footer)
+
         if interaction is not None:
             # edit the original interaction response (works after defer)
-            await interaction.edit_original_response(embed=embed, view=self)
+            await counted_edit(interaction.edit_original_response(embed=embed, view=self))
         else:
             # fallback to editing stored message if available
             if self.message:
-                await self.message.edit(embed=embed, view=self)
+                await counted_edit(self.message.edit(embed=embed, view=self))
             
-    async def end_game(self, result_text, win=False, bonus=False, draw=False):
+    def result_text(self, outcome):
+        if outcome == "bonus":
+            return f"🎉 You win! +{self.bet * BONUS_21_MULTIPLIER}"
+        if outcome == "win":
+            return f"🎉 You win! +{self.bet}"
+        if outcome == "draw":
+            return "🤝 Draw. Bet returned."
+        if outcome == "bust":
+            return f"💥 Bust! You lose {self.bet}."
+        return f"💀 You lose {self.bet}."
+
+    async def settle(self, outcome):
+        """Settle the round once. Runs in the user's queue; returns False if it was already settled."""
+        if self.game_over:
+            return False
         self.game_over = True
-        await self.disable_all_items()
-            
-        if win:
-            if bonus:
-                await update_balance(self.uid, self.bet*5, self.bet)
-            else:
-                await update_balance(self.uid, self.bet, self.bet)
-        elif draw:
-            pass
-        else:
-            await update_balance(self.uid, -self.bet, self.bet)
-
-        # logs
-        bal, total_bet = await get_balance(self.uid, "Unknown")
-        await db_log(
-            user_id=self.uid,
-            username="Unknown",
-            source="blackjack",
-            action="game_end",
-            bet_amount=self.bet,
-            delta=self.bet * (5 if bonus else 1) if win else -self.bet,
-            balance_after=bal,
-            total_bet_after=total_bet,
+
+        # Apply the result and log it in one round trip (a draw doesn't count towards total bet)
+        await settle_game(
+            self.uid, self.username, "blackjack", "game_end", round_delta(outcome, self.bet), self.bet,
+            total_bet_delta=0 if outcome == "draw" else self.bet,
             metadata={
-                "player_hand": self.player_hand,
-                "dealer_hand": self.dealer_hand,
-                "result": "win" if win else "draw" if draw else "lose"
-            }
+                "player_hand": self.player_hand.labels(),
+                "dealer_hand": self.dealer_hand.labels(),
+                "result": "win" if outcome in ("win", "bonus") else outcome if outcome == "draw" else "lose"
+            },
+            clamp=True
         )
+        return True
 
-        embed = discord.Embed(
-            title="🃏 Blackjack",
-            color=discord.Color.green() if win else discord.Color.red()
-        )
-        embed.add_field(
-            name="Your Hand",
-            value=f"{format_hand(self.player_hand)}\n({hand_value(self.player_hand)})",
-            inline=False
-        )
-        embed.add_field(
-            name="Dealer's Hand",
-            value=f"{format_hand(self.dealer_hand, hide_second_card=False)}\n({hand_value(self.dealer_hand)})",
-            inline=False
+    async def end_game(self, outcome):
+        await self.disable_all_items()
+
+        embed = hand_embed(
+            self.player_hand.key(), self.dealer_hand.key(), True,
+            discord.Color.green() if outcome in ("win", "bonus") else discord.Color.red(),
+            self.result_text(outcome)
         )
-        embed.set_footer(text=result_text)
 
         # Just edit the existing ephemeral message
-        await self.message.edit(embed=embed, view=self)
-        active_blackjack_tables.discard(self.uid)
+        await counted_edit(self.message.edit(embed=embed, view=self))
+        await get_coordinator().release_session("blackjack", self.uid)
+
+    async def play_dealer(self):
+        """Runs in the user's queue: draw the dealer's cards and settle. Returns (outcome, cards shown before)."""
+        if self.game_over:
+            return None
+        shown = len(self.dealer_hand)
+        player_total = self.player_hand.total
+        while dealer_draws(self.dealer_hand, player_total):
+            self.dealer_hand.add(shoe.draw())
+        outcome = round_outcome(player_total, self.dealer_hand.total)
+        await self.settle(outcome)
+        return outcome, shown
+
+    async def draw_player_card(self):
+        """Runs in the user's queue: hit once, settling a bust. Returns the new total."""
+        if self.game_over:
+            return None
+        self.player_hand.add(shoe.draw())
+        if self.player_hand.total > 21:
+            await self.settle("bust")
+        return self.player_hand.total
 
     @discord.ui.button(label="Stand", style=discord.ButtonStyle.primary)
     async def stand(self, interaction: discord.Interaction, button: discord.ui.Button):
         if interaction.user.id != self.uid:
             await interaction.response.send_message("❌ Not your game!", ephemeral=True)
             return
-    
-        lock = get_user_lock(self.uid)
-        async with lock:
-            if self.game_over:
-                await interaction.response.send_message("Game over! Start a new game to play again.", ephemeral=True)
-                return
-    
-            await interaction.response.defer(ephemeral=True)
-    
-            player_total = hand_value(self.player_hand)
-    
-            while True:
-                dealer_total = hand_value(self.dealer_hand)
-    
-                if dealer_total < player_total and dealer_total < 21:
-                    while True:
-                        card = draw_card()
-                        if (card not in self.dealer_hand) and (card not in self.player_hand):
-                            self.dealer_hand.append(card)
-                            break
-                    await self.update_embed(interaction=interaction, reveal_dealer=True)
-                    await asyncio.sleep(1)
-                else:
-                    break
-    
-            dealer_total = hand_value(self.dealer_hand)
-            
-            if dealer_total > 21 or player_total > dealer_total:
-                if player_total == 21:
-                    await self.end_game(f"🎉 You win! +{self.bet * 5}", win=True, bonus=True)
-                else:
-                    await self.end_game(f"🎉 You win! +{self.bet}", win=True)
-            elif player_total == dealer_total:
-                await self.end_game(f"🤝 Draw. Bet returned.", win=False, bonus=False, draw=True)
-            else:
-                await self.end_game(f"💀 You lose {self.bet}.", win=False)
+
+        if self.game_over:
+            await interaction.response.send_message("Game over! Start a new game to play again.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        played = await submit(self.uid, self.play_dealer)
+        if played is None:
+            await interaction.followup.send("Game over! Start a new game to play again.", ephemeral=True)
+            return
+        outcome, shown = played
+
+        # The round is already settled; reveal the dealer's draws one by one
+        player, dealer = self.player_hand.key(), self.dealer_hand.key()
+        for n in range(shown + 1, len(dealer) + 1):
+            embed = hand_embed(player, dealer[:n], True, discord.Color.blurple())
+            await counted_edit(interaction.edit_original_response(embed=embed, view=self))
+            await asyncio.sleep(1)
+
+        await self.end_game(outcome)
 
     @discord.ui.button(label="Hit", style=discord.ButtonStyle.primary)
     async def hit(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -169,51 +160,48 @@ class BlackjackView(discord.ui.View):
         
         # Prevent spam clicks
         button.disabled = True
-        await self.message.edit(view=self)
-        while True:
-            card = draw_card()
-            if (card not in self.player_hand) and (card not in self.dealer_hand):
-                self.player_hand.append(card) 
-                break
-        player_total = hand_value(self.player_hand)
-
-        if player_total > 21:
-            await self.end_game(f"💥 Bust! You lose {self.bet}.", win=False)
+        await counted_edit(self.message.edit(view=self))
+        player_total = await submit(self.uid, self.draw_player_card)
+
+        if player_total is None:
+            await interaction.response.defer()
+        elif player_total > 21:
+            await self.end_game("bust")
             await interaction.response.defer()
         else:
             # Re-enable buttons after valid hit
             button.disabled = False
-            await self.message.edit(view=self)
+            await counted_edit(self.message.edit(view=self))
             await self.update_embed()
             await interaction.response.defer()
 
 async def start_blackjack(interaction: discord.Interaction, bet: int):
     uid = interaction.user.id
 
-    if uid in active_blackjack_tables:
+    coordinator = get_coordinator()
+    if not await coordinator.claim_session("blackjack", uid, BLACKJACK_SESSION_TTL):
         await interaction.response.send_message(
             "⚠️ You need to finish the previous game", ephemeral=True
         )
         return
-    active_blackjack_tables.add(uid)
 
     username = interaction.user.name
     balance, _ = await get_balance(uid, username)
     if balance < bet:
+        await coordinator.release_session("blackjack", uid)
         await interaction.response.send_message(f"❌ You need at least {bet} coins!", ephemeral=True)
         return
-    view = BlackjackView(uid, bet)
+    view = BlackjackView(uid, bet, username)
 
-    embed = discord.Embed(title="🃏 Blackjack", color=discord.Color.blurple())
-    embed.add_field(name="Your Hand", value=f"{format_hand(view.player_hand)}\n({hand_value(view.player_hand)})", inline=False)
-    embed.add_field(name="Dealer's Hand", value=f"{format_hand(view.dealer_hand, hide_second_card=True)}\n(?)", inline=False)
-    embed.set_footer(text="Hit or Stand?")
+    embed = hand_embed(view.player_hand.key(), view.dealer_hand.key(), False, discord.Color.blurple(), "Hit or Stand?")
     await interaction.response.defer(ephemeral=True)
     msg = await interaction.followup.send(embed=embed, view=view, ephemeral=True)
     view.message = msg
 
 
-class BlackjackBetView(discord.ui.View):
+class BlackjackBetView(InstrumentedView):
+    game = "blackjack"
+
     def __init__(self):
         super().__init__(timeout=600)
 
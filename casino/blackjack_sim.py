@@ -0,0 +1,171 @@
+"""
+Blackjack house-edge simulator for the bot's custom rules.
+
+Plays the round rules from card_engine.py (the same ones BlackjackView uses)
+headlessly across a process pool:
+
+    python blackjack_sim.py                          # edge at the default policy + threshold sweep
+    python blackjack_sim.py --hands 20000000 --workers 8 --seed 1
+    python blackjack_sim.py --strategy               # also print a hit/stand table
+
+The player policy is "hit while total < threshold". Results are reproducible
+for a given --seed, --hands and --chunk, regardless of worker count.
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from card_engine import (
+    Shoe, Hand, RANKS, dealer_draws, round_outcome, round_delta,
+    BLACKJACK_DECKS, BLACKJACK_PENETRATION
+)
+
+OUTCOMES = ("bust", "bonus", "win", "draw", "lose")
+BET_TIERS = (50, 100, 500, 1000)
+DEFAULT_THRESHOLD = 17
+DEALER_UPCARDS = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "A")
+
+def play_round(shoe: Shoe, threshold: int) -> str:
+    """Play one round with the "hit below threshold" policy and return its outcome."""
+    shoe.start_round()
+    player = Hand((shoe.draw(), shoe.draw()))
+    dealer = Hand((shoe.draw(), shoe.draw()))
+    while player.total < threshold:
+        player.add(shoe.draw())
+    if player.total > 21:
+        return "bust"
+    while dealer_draws(dealer, player.total):
+        dealer.add(shoe.draw())
+    return round_outcome(player.total, dealer.total)
+
+def _run_chunk(task):
+    seed, hands, threshold, decks, penetration = task
+    shoe = Shoe(decks, penetration, random.Random(seed))
+    counts = dict.fromkeys(OUTCOMES, 0)
+    for _ in range(hands):
+        counts[play_round(shoe, threshold)] += 1
+    return counts
+
+def summarize(counts: dict) -> dict:
+    """Edge and per-hand standard deviation for a unit bet."""
+    hands = sum(counts.values())
+    mean = sum(round_delta(o, 1) * n for o, n in counts.items()) / hands
+    second = sum(round_delta(o, 1) ** 2 * n for o, n in counts.items()) / hands
+    return {
+        "hands": hands,
+        "edge": -mean,
+        "std": (second - mean * mean) ** 0.5,
+        "rates": {o: n / hands for o, n in counts.items()},
+    }
+
+def simulate(pool, hands: int, threshold: int, seed: int, chunk: int, decks: int, penetration: float) -> dict:
+    # Chunk i always gets seed (seed, i), so results don't depend on scheduling
+    tasks = []
+    for i, start in enumerate(range(0, hands, chunk)):
+        tasks.append((f"{seed}:{threshold}:{i}", min(chunk, hands - start), threshold, decks, penetration))
+    counts = dict.fromkeys(OUTCOMES, 0)
+    for part in pool.map(_run_chunk, tasks):
+        for o, n in part.items():
+            counts[o] += n
+    return summarize(counts)
+
+# --- Strategy table ---
+
+def _card(rank: str) -> int:
+    return RANKS.index(rank) * 4
+
+def _start_hand(total: int, soft: bool) -> Hand:
+    """A representative two-card hand with the given total."""
+    if soft:
+        return Hand((_card("A"), _card(str(total - 11))))
+    low = max(2, total - 10)
+    return Hand((_card(str(low)), _card(str(total - low))))
+
+def _play_from(shoe: Shoe, player: Hand, upcard: int, hit: bool, threshold: int) -> int:
+    player = Hand(player.cards)
+    if hit:
+        player.add(shoe.draw())
+        while player.total < threshold:
+            player.add(shoe.draw())
+    if player.total > 21:
+        return round_delta("bust", 1)
+    dealer = Hand((upcard, shoe.draw()))
+    while dealer_draws(dealer, player.total):
+        dealer.add(shoe.draw())
+    return round_delta(round_outcome(player.total, dealer.total), 1)
+
+def _strategy_cell(task):
+    seed, total, soft, upcard, trials, threshold, decks = task
+    shoe = Shoe(decks, BLACKJACK_PENETRATION, random.Random(seed))
+    player = _start_hand(total, soft)
+    up = _card(upcard)
+    stand = sum(_play_from(shoe, player, up, False, threshold) for _ in range(trials)) / trials
+    hit = sum(_play_from(shoe, player, up, True, threshold) for _ in range(trials)) / trials
+    return (total, soft, upcard, stand, hit)
+
+def strategy_table(pool, trials: int, threshold: int, seed: int, decks: int) -> dict:
+    """Best action (H/S) per starting hand and dealer upcard; hits continue with the threshold policy."""
+    cells = [(total, False) for total in range(5, 21)] + [(total, True) for total in range(13, 21)]
+    tasks = [
+        (f"{seed}:strategy:{total}:{soft}:{up}", total, soft, up, trials, threshold, decks)
+        for total, soft in cells for up in DEALER_UPCARDS
+    ]
+    table = {}
+    for total, soft, up, stand, hit in pool.map(_strategy_cell, tasks):
+        table[(total, soft, up)] = ("H" if hit > stand else "S", stand, hit)
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Blackjack house edge for the bot's rules")
+    parser.add_argument("--hands", type=int, default=2_000_000)
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD, help="player hits while total is below this")
+    parser.add_argument("--sweep", type=int, nargs=2, default=(12, 21), metavar=("FROM", "TO"),
+                        help="threshold range to compare (0 0 to skip)")
+    parser.add_argument("--strategy", action="store_true", help="print a hit/stand table")
+    parser.add_argument("--strategy-trials", type=int, default=20_000)
+    parser.add_argument("--decks", type=int, default=BLACKJACK_DECKS)
+    parser.add_argument("--penetration", type=float, default=BLACKJACK_PENETRATION)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=100_000, help="hands per task")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        start = time.perf_counter()
+        result = simulate(pool, args.hands, args.threshold, args.seed, args.chunk, args.decks, args.penetration)
+        elapsed = time.perf_counter() - start
+        rate = result["hands"] / elapsed
+
+        print(f"Rules: dealer draws only while behind, winning 21 pays x5, {args.decks} deck(s)")
+        print(f"Policy: hit below {args.threshold}, {result['hands']:,} hands, seed {args.seed}")
+        print("Outcomes: " + ", ".join(f"{o} {r:.2%}" for o, r in result["rates"].items()))
+        print(f"House edge: {result['edge']:.3%} (std {result['std']:.3f} bets/hand)")
+        print(f"Throughput: {rate:,.0f} hands/s ({rate / args.workers:,.0f} per core, {args.workers} workers)")
+
+        # Payouts scale with the bet, so every tier has the same edge; negative means the house loses
+        print(f"\n{'bet':>6} {'edge':>8} {'house coins/hand':>17}")
+        for bet in BET_TIERS:
+            print(f"{bet:>6} {result['edge']:>8.3%} {result['edge'] * bet:>17.2f}")
+
+        low, high = args.sweep
+        if high >= low > 0:
+            print(f"\n{'hit <':>6} {'edge':>8} {'bust':>7} {'x5 wins':>8}")
+            for threshold in range(low, high + 1):
+                r = simulate(pool, args.hands, threshold, args.seed, args.chunk, args.decks, args.penetration)
+                print(f"{threshold:>6} {r['edge']:>8.3%} {r['rates']['bust']:>7.2%} {r['rates']['bonus']:>8.2%}")
+
+        if args.strategy:
+            table = strategy_table(pool, args.strategy_trials, args.threshold, args.seed, args.decks)
+            print(f"\nStrategy (H = hit, S = stand; hits continue with the policy), {args.strategy_trials:,} trials/cell")
+            print("      " + " ".join(f"{up:>3}" for up in DEALER_UPCARDS))
+            for soft in (False, True):
+                totals = sorted({t for t, s, _ in table if s == soft})
+                for total in totals:
+                    label = f"{'A' + str(total - 11) if soft else total}"
+                    row = " ".join(f"{table[(total, soft, up)][0]:>3}" for up in DEALER_UPCARDS)
+                    print(f"{label:>5} {row}")
+
+if __name__ == "__main__":
+    main()
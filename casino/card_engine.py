@@ -0,0 +1,135 @@
+import os
+import random
+from array import array
+
+# --- Blackjack card engine ---
+# Cards are small ints (rank * 4 + suit), so a shoe is a flat byte array and
+# a draw is an index bump. No Discord imports: simulators and benchmarks use
+# this module directly.
+
+RANKS = ("A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
+SUITS = ("♠", "♥", "♦", "♣")
+RANK_VALUES = (11, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10)
+
+DECK_SIZE = len(RANKS) * len(SUITS)
+# Lookup tables indexed by card id
+CARD_LABELS = tuple(f"{rank}{suit}" for rank in RANKS for suit in SUITS)
+CARD_VALUES = tuple(RANK_VALUES[card // len(SUITS)] for card in range(DECK_SIZE))
+
+BLACKJACK_DECKS = int(os.getenv("BLACKJACK_DECKS", "6"))
+BLACKJACK_PENETRATION = float(os.getenv("BLACKJACK_PENETRATION", "0.75"))
+
+class Shoe:
+    """
+    A shoe of `decks` decks, shuffled once into a byte array. draw() is O(1);
+    start_round() reshuffles once `penetration` of the shoe has been dealt.
+    """
+    def __init__(self, decks: int = 1, penetration: float = 0.75, rng: random.Random = None):
+        self.decks = decks
+        self.penetration = penetration
+        self._rng = rng or random.Random()
+        self._cards = array("B", range(DECK_SIZE)) * decks
+        self._cut = int(len(self._cards) * penetration)
+        self._pos = 0
+        self.shuffles = 0
+        self.shuffle()
+
+    def shuffle(self):
+        self._rng.shuffle(self._cards)
+        self._pos = 0
+        self.shuffles += 1
+
+    def start_round(self):
+        """Reshuffle if the cut card has been reached. Call before each deal."""
+        if self._pos >= self._cut:
+            self.shuffle()
+
+    def draw(self) -> int:
+        if self._pos >= len(self._cards):
+            # Ran out mid-round (only with very deep penetration); start over
+            self.shuffle()
+        card = self._cards[self._pos]
+        self._pos += 1
+        return card
+
+    @property
+    def remaining(self) -> int:
+        return len(self._cards) - self._pos
+
+class Hand:
+    """
+    Cards plus a running (total, soft_aces) pair. soft_aces counts aces still
+    valued at 11, so adding a card never needs to rescan the hand.
+    """
+    __slots__ = ("cards", "total", "soft_aces")
+
+    def __init__(self, cards=()):
+        self.cards = []
+        self.total = 0
+        self.soft_aces = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: int):
+        self.cards.append(card)
+        value = CARD_VALUES[card]
+        self.total += value
+        if value == 11:
+            self.soft_aces += 1
+        while self.total > 21 and self.soft_aces:
+            self.total -= 10
+            self.soft_aces -= 1
+
+    @property
+    def soft(self) -> bool:
+        return self.soft_aces > 0
+
+    def key(self) -> tuple:
+        return tuple(self.cards)
+
+    def labels(self) -> list[str]:
+        return [CARD_LABELS[card] for card in self.cards]
+
+    def __len__(self):
+        return len(self.cards)
+
+def hand_value(cards) -> int:
+    """Blackjack value of a Hand or any iterable of card ids."""
+    if isinstance(cards, Hand):
+        return cards.total
+    return Hand(cards).total
+
+def format_hand(cards, hide_second_card=False) -> str:
+    cards = cards.cards if isinstance(cards, Hand) else cards
+    if hide_second_card and len(cards) > 1:
+        return f"{CARD_LABELS[cards[0]]} | ❓"
+    return " | ".join(CARD_LABELS[card] for card in cards)
+
+# --- Round rules (shared by BlackjackView and blackjack_sim.py) ---
+# The dealer only draws while behind the player, a winning 21 pays 5x and
+# there is no dealer blackjack check.
+
+BONUS_21_MULTIPLIER = 5
+
+def dealer_draws(dealer: Hand, player_total: int) -> bool:
+    return dealer.total < player_total and dealer.total < 21
+
+def round_outcome(player_total: int, dealer_total: int) -> str:
+    """One of "bust", "bonus" (winning 21), "win", "draw", "lose"."""
+    if player_total > 21:
+        return "bust"
+    if dealer_total > 21 or player_total > dealer_total:
+        return "bonus" if player_total == 21 else "win"
+    if player_total == dealer_total:
+        return "draw"
+    return "lose"
+
+def round_delta(outcome: str, bet: int) -> int:
+    """Balance change for a finished round."""
+    if outcome == "bonus":
+        return bet * BONUS_21_MULTIPLIER
+    if outcome == "win":
+        return bet
+    if outcome == "draw":
+        return 0
+    return -bet
@@ -0,0 +1,153 @@
+import asyncio
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+
+import user_executor
+from database import acquire, hold_connection, account_cache
+
+# --- Cross-process coordination ---
+# Per-user locks, cooldowns and "one active game per user" sessions.
+# CASINO_COORDINATION=local (default) keeps them in process memory, which is
+# all a single bot process needs. CASINO_COORDINATION=postgres moves them into
+# Postgres (advisory locks + UNLOGGED tables) so several bot processes or
+# shards can serve the same users.
+
+COORDINATION_BACKEND = os.getenv("CASINO_COORDINATION", "local")
+LOCK_TIMEOUT = float(os.getenv("CASINO_LOCK_TIMEOUT", "10"))  # seconds
+PRUNE_INTERVAL = 300  # seconds
+
+class LocalCoordinator:
+    """In-process coordination: the per-user executor already serializes steps."""
+    distributed = False
+
+    def __init__(self):
+        self._sessions = {}  # (kind, uid) -> expires_at
+
+    @asynccontextmanager
+    async def user_lock(self, uid: int):
+        yield
+
+    async def try_cooldown(self, uid: int, kind: str, cooldown: float) -> bool:
+        return user_executor.can_act(uid, cooldown)
+
+    async def claim_session(self, kind: str, uid: int, ttl: float) -> bool:
+        now = time.monotonic()
+        expires_at = self._sessions.get((kind, uid))
+        if expires_at is not None and expires_at > now:
+            return False
+        self._sessions[(kind, uid)] = now + ttl
+        return True
+
+    async def release_session(self, kind: str, uid: int):
+        self._sessions.pop((kind, uid), None)
+
+    async def prune(self):
+        now = time.monotonic()
+        for key in [k for k, expires_at in self._sessions.items() if expires_at <= now]:
+            del self._sessions[key]
+
+class PostgresCoordinator:
+    """Coordination shared by every process using the same database."""
+    distributed = True
+
+    @asynccontextmanager
+    async def user_lock(self, uid: int):
+        # Session advisory lock keyed by user_id, taken on a connection the
+        # step's own queries then reuse, so a step holds one pool connection
+        # however many queries it makes. Releasing the connection to the pool
+        # also drops the lock (asyncpg resets it with pg_advisory_unlock_all).
+        async with hold_connection("user_lock") as conn:
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            delay = 0.01
+            while not await conn.fetchval("SELECT pg_try_advisory_lock($1)", uid):
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for the lock of user {uid}")
+                await asyncio.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, 0.2)
+            try:
+                yield
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", uid)
+
+    async def try_cooldown(self, uid: int, kind: str, cooldown: float) -> bool:
+        async with acquire("try_cooldown") as conn:
+            return await conn.fetchval(
+                """
+                INSERT INTO casino_cooldowns AS c (user_id, kind, last_at)
+                VALUES ($1, $2, clock_timestamp())
+                ON CONFLICT (user_id, kind) DO UPDATE
+                SET last_at = EXCLUDED.last_at
+                WHERE c.last_at <= EXCLUDED.last_at - make_interval(secs => $3)
+                RETURNING TRUE
+                """,
+                uid, kind, cooldown
+            ) is not None
+
+    async def claim_session(self, kind: str, uid: int, ttl: float) -> bool:
+        async with acquire("claim_session") as conn:
+            return await conn.fetchval(
+                """
+                INSERT INTO casino_sessions AS s (kind, user_id, expires_at)
+                VALUES ($1, $2, clock_timestamp() + make_interval(secs => $3))
+                ON CONFLICT (kind, user_id) DO UPDATE
+                SET expires_at = EXCLUDED.expires_at
+                WHERE s.expires_at <= clock_timestamp()
+                RETURNING TRUE
+                """,
+                kind, uid, ttl
+            ) is not None
+
+    async def release_session(self, kind: str, uid: int):
+        async with acquire("release_session") as conn:
+            await conn.execute(
+                "DELETE FROM casino_sessions WHERE kind = $1 AND user_id = $2", kind, uid
+            )
+
+    async def prune(self):
+        async with acquire("prune") as conn:
+            await conn.execute("DELETE FROM casino_sessions WHERE expires_at <= clock_timestamp()")
+            await conn.execute(
+                "DELETE FROM casino_cooldowns WHERE last_at < clock_timestamp() - interval '1 hour'"
+            )
+
+_coordinator = LocalCoordinator()
+_prune_task = None
+
+def get_coordinator():
+    return _coordinator
+
+async def init_coordination():
+    """Pick the backend from CASINO_COORDINATION. Call after the migrations."""
+    global _coordinator, _prune_task
+    if COORDINATION_BACKEND == "postgres" and not _coordinator.distributed:
+        _coordinator = PostgresCoordinator()
+        # Every executor step also holds the user's advisory lock
+        user_executor.set_step_guard(_coordinator.user_lock)
+        # Other processes change balances too, so cached reads would go stale
+        account_cache.max_size = 0
+        account_cache.clear()
+    elif COORDINATION_BACKEND not in ("local", "postgres"):
+        raise RuntimeError(f"Unknown CASINO_COORDINATION backend: {COORDINATION_BACKEND}")
+
+    if _prune_task is None or _prune_task.done():
+        _prune_task = asyncio.create_task(_prune_loop())
+
+async def close_coordination():
+    global _prune_task
+    if _prune_task is not None:
+        _prune_task.cancel()
+        try:
+            await _prune_task
+        except asyncio.CancelledError:
+            pass
+        _prune_task = None
+
+async def _prune_loop():
+    while True:
+        await asyncio.sleep(PRUNE_INTERVAL)
+        try:
+            await _coordinator.prune()
+        except Exception as e:
+            print(f"Coordination prune failed: {e}", flush=True)
@@ -1,12 +1,15 @@
 import asyncpg
 import asyncio
+import contextvars
 import time
 import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from json import dumps
+from db_config import build_dsn, pool_options, DB_ACQUIRE_TIMEOUT
+import metrics
 
-DB_DSN = (
-    f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWD')}"
-    f"@postgres-casino:5432/casino"
-)
+DB_DSN = build_dsn()
 
 # Connection pool - create once, reuse connections
 pool = None
@@ -14,166 +17,517 @@ pool = None
 async def init_pool():
     global pool
     if pool is None:
-        pool = await asyncpg.create_pool(dsn=DB_DSN)
+        pool = await asyncpg.create_pool(dsn=DB_DSN, init=_warm_connection, **pool_options())
 
 def get_pool():
     if pool is None:
         raise RuntimeError("Database pool not initialized yet!")
     return pool
 
-# --- Database and user balance functions ---
+pool_stats = {
+    "acquires": 0,
+    "timeouts": 0,
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+    "in_use": 0,
+    "max_in_use": 0,
+}
 
-async def init_db():
-    async with pool.acquire() as conn:
-        # Create log table if not exists
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS logs (
-                id BIGSERIAL PRIMARY KEY,
-                user_id BIGINT NOT NULL,
-                username TEXT DEFAULT '',
-                source TEXT DEFAULT '',
-                action TEXT NOT NULL,              
-                bet_amount INTEGER DEFAULT 0,
-                delta INTEGER NOT NULL,             
-                balance_after INTEGER NOT NULL,
-                total_bet_after INTEGER DEFAULT 0,
-                metadata JSONB DEFAULT '{}',
-                created_at TIMESTAMP DEFAULT now()
-            );
-        """)
-
-        # Create table if not exists
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS user_accounts (
-                user_id BIGINT PRIMARY KEY,
-                username TEXT DEFAULT '',
-                balance INTEGER DEFAULT 30000 CHECK (balance >= 0),
-                total_bet INTEGER DEFAULT 0,
-                last_daily_claim BIGINT DEFAULT 0,
-                wheel_state SMALLINT DEFAULT 0
-            )
-        """)
+# Connection held by the running task (see hold_connection); acquire() in
+# that same task reuses it instead of taking a second one from the pool.
+_held = contextvars.ContextVar("held_connection", default=None)
 
-        # Make sure balance isn't already negative from old data
-        await conn.execute("UPDATE user_accounts SET balance = 0 WHERE balance < 0;")
-        
-        # Now ensure CHECK constraint exists
-        await conn.execute("""
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM pg_constraint
-                    WHERE conname = 'balance_non_negative'
-                ) THEN
-                    ALTER TABLE user_accounts
-                    ADD CONSTRAINT balance_non_negative CHECK (balance >= 0);
-                END IF;
-            END
-            $$;
-        """)
-        # Define new columns to add if missing, with their SQL definitions
-        new_columns = {
-            "wheel_state": "SMALLINT DEFAULT 0",
-            # Add more columns here, for example:
-            # "new_column_name": "TEXT DEFAULT ''",
-            # "another_column": "BOOLEAN DEFAULT FALSE"
+@asynccontextmanager
+async def acquire(name: str = "other"):
+    """
+    pool.acquire() that records wait time, connections in use and acquire
+    timeouts, and how long operation `name` held the connection.
+    """
+    held = _held.get()
+    if held is not None and held[0] is asyncio.current_task():
+        start = time.perf_counter()
+        try:
+            yield held[1]
+        finally:
+            metrics.db_query_seconds.observe(time.perf_counter() - start, name)
+        return
+
+    start = time.perf_counter()
+    try:
+        conn = await get_pool().acquire(timeout=DB_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        pool_stats["timeouts"] += 1
+        raise
+    acquired = time.perf_counter()
+    wait_ms = (acquired - start) * 1000
+    metrics.db_pool_wait_seconds.observe(acquired - start)
+    pool_stats["acquires"] += 1
+    pool_stats["total_wait_ms"] += wait_ms
+    pool_stats["max_wait_ms"] = max(pool_stats["max_wait_ms"], wait_ms)
+    pool_stats["in_use"] += 1
+    pool_stats["max_in_use"] = max(pool_stats["max_in_use"], pool_stats["in_use"])
+    try:
+        yield conn
+    finally:
+        pool_stats["in_use"] -= 1
+        metrics.db_query_seconds.observe(time.perf_counter() - acquired, name)
+        await pool.release(conn)
+
+@asynccontextmanager
+async def hold_connection(name: str = "other"):
+    """
+    Acquire a connection and keep it for the block: every acquire() the
+    current task makes inside it gets this connection, so the block never
+    needs more than one. Tasks started inside the block use the pool.
+    """
+    async with acquire(name) as conn:
+        token = _held.set((asyncio.current_task(), conn))
+        try:
+            yield conn
+        finally:
+            _held.reset(token)
+
+def get_pool_stats() -> dict:
+    stats = dict(pool_stats)
+    stats["avg_wait_ms"] = stats["total_wait_ms"] / stats["acquires"] if stats["acquires"] else 0.0
+    if pool is not None:
+        stats["size"] = pool.get_size()
+        stats["idle"] = pool.get_idle_size()
+        stats["max_size"] = pool.get_max_size()
+    return stats
+
+metrics.register_gauge("casino_db_pool_in_use", "Pool connections checked out", lambda: pool_stats["in_use"])
+metrics.register_gauge("casino_db_pool_size", "Open pool connections", lambda: pool.get_size() if pool else 0)
+metrics.register_gauge("casino_db_pool_timeouts", "Acquires that timed out since start", lambda: pool_stats["timeouts"])
+
+async def get_meta(key: str) -> str | None:
+    async with acquire("get_meta") as conn:
+        return await conn.fetchval("SELECT value FROM bot_meta WHERE key = $1", key)
+
+async def set_meta(key: str, value: str):
+    async with acquire("set_meta") as conn:
+        await conn.execute(
+            """
+            INSERT INTO bot_meta (key, value) VALUES ($1, $2)
+            ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = now()
+            """,
+            key, value
+        )
+
+# --- Account cache ---
+
+ACCOUNT_CACHE_SIZE = int(os.getenv("ACCOUNT_CACHE_SIZE", "5000"))
+ACCOUNT_CACHE_TTL = float(os.getenv("ACCOUNT_CACHE_TTL", "300"))  # seconds
+
+# Columns every account mutation returns so the cache can be written through
+ACCOUNT_COLUMNS = "balance, total_bet, wheel_state, username"
+
+GET_ACCOUNT_SQL = f"SELECT {ACCOUNT_COLUMNS} FROM user_accounts WHERE user_id = $1"
+
+class AccountCache:
+    """
+    LRU + TTL cache of account rows (balance, total_bet, wheel_state, username).
+    Entries are written through from the RETURNING row of every balance mutation,
+    so reads of an active user's own account don't need a database round trip.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, row dict)
+        self._reads = {}  # user_id -> [reads in flight, written since they started]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: int) -> dict | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, row = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[user_id]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return row
+
+    def put(self, user_id: int, row):
+        self._written(user_id)
+        self._store(user_id, row)
+
+    @contextmanager
+    def fill(self, user_id: int):
+        """
+        Wrap a database read made on a miss; call the yielded function with
+        the row. The read can finish after a concurrent settle wrote its newer
+        row through, so the row is only stored if nothing wrote user_id since
+        the read started.
+        """
+        reads = self._reads.setdefault(user_id, [0, False])
+        reads[0] += 1
+
+        def store(row):
+            if not reads[1]:
+                self._store(user_id, row)
+
+        try:
+            yield store
+        finally:
+            reads[0] -= 1
+            if reads[0] == 0 and self._reads.get(user_id) is reads:
+                del self._reads[user_id]
+
+    def _written(self, user_id: int):
+        reads = self._reads.get(user_id)
+        if reads is not None:
+            reads[1] = True
+
+    def _store(self, user_id: int, row):
+        if self.max_size <= 0 or row is None:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, {
+            "balance": row["balance"],
+            "total_bet": row["total_bet"],
+            "wheel_state": row["wheel_state"],
+            "username": row["username"],
+        })
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set_username(self, user_id: int, username: str):
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            entry[1]["username"] = username
+
+    def invalidate(self, user_id: int):
+        self._written(user_id)
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        for reads in self._reads.values():
+            reads[1] = True
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
         }
 
-        for column, definition in new_columns.items():
-            col = await conn.fetchval(f"""
-                SELECT column_name FROM information_schema.columns
-                WHERE table_name='user_accounts' AND column_name='{column}'
-            """)
-            if col is None:
-                await conn.execute(f"""
-                    ALTER TABLE user_accounts ADD COLUMN {column} {definition}
-                """)
-
-async def get_users_info() -> list[dict]:
+account_cache = AccountCache(ACCOUNT_CACHE_SIZE, ACCOUNT_CACHE_TTL)
+
+metrics.register_gauge("casino_account_cache_hits", "Account cache hits since start", lambda: account_cache.hits)
+metrics.register_gauge("casino_account_cache_misses", "Account cache misses since start", lambda: account_cache.misses)
+metrics.register_gauge("casino_account_cache_evictions", "Account cache entries expired or evicted since start", lambda: account_cache.evictions)
+metrics.register_gauge("casino_account_cache_size", "Accounts in the cache", lambda: len(account_cache._entries))
+
+# --- Username sync ---
+# Usernames are only written when they differ from the known one, and the
+# changes are collected and written in one batched UPDATE in the background.
+
+USERNAME_FLUSH_INTERVAL = float(os.getenv("USERNAME_FLUSH_INTERVAL", "30"))  # seconds
+USERNAME_BATCH_SIZE = 500
+
+_pending_usernames = {}  # user_id -> latest username seen
+_username_flush_needed = None
+_username_task = None
+
+username_stats = {
+    "writes_avoided": 0,
+    "queued": 0,
+    "written": 0,
+    "flushes": 0,
+}
+
+def sync_username(user_id: int, username: str, known_username: str | None):
+    """Queue a username write if it differs from the one already stored."""
+    if not username:
+        return
+    if username == known_username:
+        username_stats["writes_avoided"] += 1
+        return
+    if user_id in _pending_usernames:
+        # Coalesced with a write that's already waiting
+        username_stats["writes_avoided"] += 1
+    else:
+        username_stats["queued"] += 1
+    _pending_usernames[user_id] = username
+    account_cache.set_username(user_id, username)
+    if len(_pending_usernames) >= USERNAME_BATCH_SIZE and _username_flush_needed is not None:
+        _username_flush_needed.set()
+
+def start_username_sync():
+    global _username_task, _username_flush_needed
+    if _username_task is not None and not _username_task.done():
+        return
+    _username_flush_needed = asyncio.Event()
+    _username_task = asyncio.create_task(_username_sync_loop())
+
+async def stop_username_sync():
+    global _username_task
+    if _username_task is not None:
+        _username_task.cancel()
+        try:
+            await _username_task
+        except asyncio.CancelledError:
+            pass
+        _username_task = None
+    await flush_usernames()
+
+async def _username_sync_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_username_flush_needed.wait(), USERNAME_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _username_flush_needed.clear()
+        try:
+            await flush_usernames()
+        except Exception as e:
+            print(f"Username sync failed: {e}", flush=True)
+
+async def flush_usernames():
+    if not _pending_usernames or pool is None:
+        return
+    batch = dict(_pending_usernames)
+    _pending_usernames.clear()
+    try:
+        async with acquire("flush_usernames") as conn:
+            await conn.execute(
+                """
+                UPDATE user_accounts AS ua
+                SET username = v.username
+                FROM unnest($1::bigint[], $2::text[]) AS v(user_id, username)
+                WHERE ua.user_id = v.user_id AND ua.username IS DISTINCT FROM v.username
+                """,
+                list(batch.keys()), list(batch.values())
+            )
+    except Exception:
+        # Put them back unless a newer name arrived meanwhile
+        for uid, name in batch.items():
+            _pending_usernames.setdefault(uid, name)
+        raise
+    username_stats["written"] += len(batch)
+    username_stats["flushes"] += 1
+
+# --- Database and user balance functions ---
+
+USERS_PAGE_SIZE = 20
+
+async def get_users_page(after: tuple = None, before: tuple = None, limit: int = USERS_PAGE_SIZE) -> list[dict]:
     """
-    Retrieve all users from the database, sorted by balance DESC.
-    Returns a list of dicts with: user_id, username, balance, total_bet
+    One page of accounts ordered by balance DESC, user_id DESC.
+    after/before are the (balance, user_id) of the last/first row of the
+    current page; pass neither for the first page. Fetches limit + 1 rows so
+    callers can tell whether there is another page in that direction.
     """
-    async with pool.acquire() as conn:
+    async with acquire("get_users_page") as conn:
+        if before is not None:
+            rows = await conn.fetch("""
+                SELECT user_id, username, balance, total_bet
+                FROM user_accounts
+                WHERE (balance, user_id) > ($1, $2)
+                ORDER BY balance, user_id
+                LIMIT $3
+            """, before[0], before[1], limit + 1)
+            rows = rows[::-1]
+        elif after is not None:
+            rows = await conn.fetch("""
+                SELECT user_id, username, balance, total_bet
+                FROM user_accounts
+                WHERE (balance, user_id) < ($1, $2)
+                ORDER BY balance DESC, user_id DESC
+                LIMIT $3
+            """, after[0], after[1], limit + 1)
+        else:
+            rows = await conn.fetch("""
+                SELECT user_id, username, balance, total_bet
+                FROM user_accounts
+                ORDER BY balance DESC, user_id DESC
+                LIMIT $1
+            """, limit + 1)
+    return [dict(row) for row in rows]
+
+async def search_users(prefix: str, limit: int = 25) -> list[dict]:
+    """Accounts whose username starts with prefix (case-insensitive), by username."""
+    prefix = prefix.lower()
+    async with acquire("search_users") as conn:
+        # ~>=~ / ~<~ are the text_pattern_ops operators, so this is a range
+        # scan on user_accounts_username_prefix_idx even as a prepared statement
         rows = await conn.fetch("""
             SELECT user_id, username, balance, total_bet
             FROM user_accounts
-            ORDER BY balance DESC
-        """)
-        # Convert to list of dicts
-        return [
-            {
-                "user_id": row["user_id"],
-                "username": row["username"],
-                "balance": row["balance"],
-                "total_bet": row["total_bet"]
-            }
-            for row in rows
-        ]
+            WHERE lower(username) ~>=~ $1 AND lower(username) ~<~ $2
+            ORDER BY lower(username), user_id
+            LIMIT $3
+        """, prefix, prefix + "\U0010ffff", limit)
+    return [dict(row) for row in rows]
 
 # Get balance and total bet for a user
 async def get_balance(user_id: int, username: str = "", admin=False):
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT balance, total_bet FROM user_accounts WHERE user_id = $1", user_id
-        )
+    cached = account_cache.get(user_id)
+    if cached:
+        if not admin:
+            sync_username(user_id, username, cached["username"])
+        return (cached['balance'], cached['total_bet'])
+
+    async with acquire("get_balance") as conn:
+        with account_cache.fill(user_id) as fill:
+            row = await conn.fetchrow(GET_ACCOUNT_SQL, user_id)
+            fill(row)
         if row:
-            if username and not admin:
-                await conn.execute(
-                    "UPDATE user_accounts SET username = $1 WHERE user_id = $2", username, user_id
-                )
+            if not admin:
+                sync_username(user_id, username, row['username'])
             return (row['balance'], row['total_bet'])
         
         # Insert new user with default balance
         if not admin:
-            await conn.execute(
-                "INSERT INTO user_accounts (user_id, username, balance, total_bet) VALUES ($1, $2, 30000, 0)",
+            row = await conn.fetchrow(
+                f"""
+                INSERT INTO user_accounts (user_id, username, balance, total_bet) VALUES ($1, $2, 30000, 0)
+                RETURNING {ACCOUNT_COLUMNS}
+                """,
                 user_id, username
             )
+            account_cache.put(user_id, row)
             return (30000, 0)
 
-# Update balance and total bet
-async def update_balance(user_id: int, win_amount: int, bet_amount: int):
-    async with pool.acquire() as conn:
-        await conn.execute(
-            """
-            UPDATE user_accounts
-            SET balance = GREATEST(balance + $1, 0),
-                total_bet = total_bet + $2
-            WHERE user_id = $3
-            RETURNING balance
-            """,
-            win_amount, abs(bet_amount), user_id
-        )
+# Get the current wheel position for a user
+async def get_wheel_state(user_id: int) -> int:
+    cached = account_cache.get(user_id)
+    if cached:
+        return cached['wheel_state']
+
+    async with acquire("get_wheel_state") as conn:
+        with account_cache.fill(user_id) as fill:
+            row = await conn.fetchrow(GET_ACCOUNT_SQL, user_id)
+            fill(row)
+    return row['wheel_state'] if row else 0  # default to 0 if missing
+
+DAILY_REWARD = 3000
+
+CLAIM_DAILY_SQL = f"""
+    INSERT INTO user_accounts AS ua (user_id, username, balance, total_bet, last_daily_claim)
+    VALUES ($1, $2, 30000 + $3, 0, $4)
+    ON CONFLICT (user_id) DO UPDATE
+    SET balance = ua.balance + $3, last_daily_claim = $4
+    WHERE ua.last_daily_claim IS NULL
+       OR (to_timestamp(ua.last_daily_claim) AT TIME ZONE 'UTC')::date
+          < (to_timestamp($4) AT TIME ZONE 'UTC')::date
+    RETURNING {ACCOUNT_COLUMNS}
+"""
 
-# Update balance and total bet
-async def update_balance_atomic(user_id: int, net_change: int, bet_amount: int) -> bool:
-    async with pool.acquire() as conn:
+async def claim_daily_reward(user_id: int, username: str, current_time: int) -> int | None:
+    """
+    Credit the daily reward unless it was already claimed on the same UTC day.
+    The upsert, the day check, the timestamp and the credit are one statement,
+    so a claim is either fully applied or not at all. Returns the new balance,
+    or None if the reward was already claimed today.
+    """
+    async with acquire("claim_daily_reward") as conn:
+        row = await conn.fetchrow(CLAIM_DAILY_SQL, user_id, username, DAILY_REWARD, current_time)
+    if row is None:
+        return None
+    account_cache.put(user_id, row)
+    return row['balance']
+
+# Settle a finished game in one round trip: create the account if needed,
+# apply the balance/total_bet change, write the log row, bump the day's
+# game_stats_daily row and return the new state.
+# With clamp=False the update is rejected if it would overdraw the balance;
+# with clamp=True the balance is floored at 0.
+SETTLE_GAME_SQL = """
+    WITH upd AS (
+        INSERT INTO user_accounts AS ua (user_id, username, balance, total_bet, wheel_state)
+        VALUES ($1, $2, GREATEST(30000 + $3, 0), $5, COALESCE($9::smallint, 0))
+        ON CONFLICT (user_id) DO UPDATE
+        SET balance = GREATEST(ua.balance + $3, 0),
+            total_bet = ua.total_bet + $5,
+            wheel_state = COALESCE($9::smallint, ua.wheel_state)
+        WHERE $10::boolean OR ua.balance + $3 >= 0
+        RETURNING ua.user_id, ua.balance, ua.total_bet, ua.wheel_state, ua.username
+    ), ins AS (
+        INSERT INTO logs (user_id, username, source, action, bet_amount, delta, balance_after, total_bet_after, metadata)
+        SELECT upd.user_id, $2::text, $6::text, $7::text, $4::integer, $3, upd.balance, upd.total_bet, $8::jsonb
+        FROM upd
+    ), stats AS (
+        INSERT INTO game_stats_daily AS gs (user_id, source, day, rounds, wins, bets, net_delta)
+        SELECT upd.user_id, $6::text, CURRENT_DATE, 1, ($3 > 0)::integer, $4::integer, $3
+        FROM upd
+        WHERE $6::text IN ('slots', 'blackjack', 'wheel_of_fortune')  -- games only, not admin changes
+        ON CONFLICT (user_id, source, day) DO UPDATE
+        SET rounds = gs.rounds + 1,
+            wins = gs.wins + EXCLUDED.wins,
+            bets = gs.bets + EXCLUDED.bets,
+            net_delta = gs.net_delta + EXCLUDED.net_delta
+    )
+    SELECT TRUE AS settled, balance, total_bet, wheel_state, username FROM upd
+    UNION ALL
+    SELECT FALSE, balance, total_bet, wheel_state, username FROM user_accounts
+    WHERE user_id = $1 AND NOT EXISTS (SELECT 1 FROM upd)
+"""
+
+async def settle_game(
+    user_id: int,
+    username: str,
+    source: str,
+    action: str,
+    delta: int,
+    bet_amount: int = 0,
+    *,
+    total_bet_delta: int = None,
+    wheel_state: int = None,
+    metadata: dict = None,
+    clamp: bool = False
+):
+    """
+    Apply a game result, log it and return (settled, balance, total_bet).
+    settled is False when the change was rejected for insufficient funds;
+    balance/total_bet are then the unchanged values.
+    """
+    if total_bet_delta is None:
+        total_bet_delta = abs(bet_amount)
+    async with acquire("settle_game") as conn:
         row = await conn.fetchrow(
-            """
-            UPDATE user_accounts
-            SET balance = balance + $1, total_bet = total_bet + $2
-            WHERE user_id = $3 AND balance + $1 >= 0
-            RETURNING balance
-            """,
-            net_change, abs(bet_amount), user_id
+            SETTLE_GAME_SQL,
+            user_id, username, delta, bet_amount, total_bet_delta,
+            source, action, dumps(metadata or {}), wheel_state, clamp
         )
-        return row is not None
-
-# User concurrency control (same logic as before)
-user_locks = {}
-user_last_action = {}
+    account_cache.put(user_id, row)
+    return (row['settled'], row['balance'], row['total_bet'])
 
-def get_user_lock(uid):
-    if uid not in user_locks:
-        user_locks[uid] = asyncio.Lock()
-    return user_locks[uid]
+# --- Connection warm-up ---
+# Every new pool connection runs the hot statements once with dummy arguments
+# inside a transaction that is rolled back. That leaves them parsed, planned
+# and in asyncpg's statement cache, so the first real request on a fresh
+# connection skips the prepare round trip.
 
-def can_act(uid, cooldown):
-    now = time.time()
-    last = user_last_action.get(uid, 0)
-    if now - last < cooldown:
-        return False
-    user_last_action[uid] = now
-    return True
+def _hot_statements():
+    now = int(time.time())
+    return [
+        (GET_ACCOUNT_SQL, (-1,)),
+        (SETTLE_GAME_SQL, (-1, "", 0, 0, 0, "warmup", "warmup", "{}", None, False)),
+        (CLAIM_DAILY_SQL, (-1, "", DAILY_REWARD, now)),
+    ]
 
+async def _warm_connection(conn):
+    tx = conn.transaction()
+    await tx.start()
+    try:
+        for sql, args in _hot_statements():
+            await conn.fetch(sql, *args)
+    except asyncpg.PostgresError as e:
+        # e.g. before the first migration has created the tables
+        print(f"Statement warm-up skipped: {e}", flush=True)
+    finally:
+        await tx.rollback()
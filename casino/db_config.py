@@ -0,0 +1,35 @@
+import os
+from urllib.parse import quote
+
+# --- Database connection settings ---
+# Everything comes from the environment so the same image works against the
+# compose database, a managed instance or a local test server.
+
+POSTGRES_HOST = os.getenv("POSTGRES_HOST", "postgres-casino")
+POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", "5432"))
+POSTGRES_DB = os.getenv("POSTGRES_DB", "casino")
+POSTGRES_USER = os.getenv("POSTGRES_USER", "")
+POSTGRES_PASSWD = os.getenv("POSTGRES_PASSWD", "")
+
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "10"))  # seconds per query
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", "5"))  # seconds waiting for a free connection
+DB_MAX_INACTIVE_LIFETIME = float(os.getenv("DB_MAX_INACTIVE_LIFETIME", "300"))  # seconds before an idle connection is closed
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))  # prepared statements kept per connection
+
+def build_dsn() -> str:
+    credentials = quote(POSTGRES_USER, safe="")
+    if POSTGRES_PASSWD:
+        credentials += ":" + quote(POSTGRES_PASSWD, safe="")
+    return f"postgresql://{credentials}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+
+def pool_options() -> dict:
+    """Keyword arguments for asyncpg.create_pool (besides dsn and init)."""
+    return {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "command_timeout": DB_COMMAND_TIMEOUT,
+        "max_inactive_connection_lifetime": DB_MAX_INACTIVE_LIFETIME,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
@@ -0,0 +1,181 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import discord
+from aiohttp import web
+
+import database
+
+# --- Fake Discord ---
+# A local stand-in for Discord's REST API plus synthetic INTERACTION_CREATE
+# payloads, for CASINO_FAKE_GATEWAY=1. The bot logs in against it for real
+# (so setup_hook runs as in production), and the payloads go through the same
+# connection parser and view store a gateway event would, so what's measured
+# is the bot's own work: parsing, views, database, responses.
+
+FAKE_API_LATENCY = float(os.getenv("CASINO_FAKE_API_LATENCY_MS", "80")) / 1000  # mean seconds per API call
+FAKE_USERS = int(os.getenv("CASINO_FAKE_USERS", "1000"))  # virtual players per cluster
+FAKE_UID_BASE = -2_000_000_000  # virtual players get negative ids, which no Discord user has
+
+# Home screen buttons and how often players press them
+HOME_CLICKS = (
+    ("check_balance_main", 30),
+    ("top_5", 15),
+    ("daily_reward", 10),
+    ("goto_slots", 20),
+    ("goto_blackjack", 10),
+    ("goto_fortune", 15),
+)
+
+APPLICATION_ID = 1000000000000000001
+BOT_USER = {"id": str(APPLICATION_ID), "username": "casino", "discriminator": "0", "global_name": None, "avatar": None, "bot": True}
+CHANNEL_ID = 1000000000000000002
+HOME_MESSAGE_ID = 1000000000000000003
+
+_snowflakes = itertools.count(discord.utils.time_snowflake(datetime.now(timezone.utc)))
+
+def _user(uid: int) -> dict:
+    return {"id": str(uid), "username": f"player{-uid}", "discriminator": "0", "global_name": None, "avatar": None}
+
+def _message(message_id: int, body: dict = None) -> dict:
+    body = body or {}
+    return {
+        "id": str(message_id), "channel_id": str(CHANNEL_ID), "author": BOT_USER, "type": 0,
+        "content": body.get("content") or "", "embeds": body.get("embeds") or [],
+        "timestamp": datetime.now(timezone.utc).isoformat(), "edited_timestamp": None,
+        "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+        "attachments": [], "pinned": False, "flags": body.get("flags", 0),
+    }
+
+def home_click(uid: int, custom_id: str) -> dict:
+    """INTERACTION_CREATE payload for a button press on the /casino message."""
+    interaction_id = next(_snowflakes)
+    return {
+        "id": str(interaction_id),
+        "application_id": str(APPLICATION_ID),
+        "type": 3,
+        "token": f"token-{interaction_id}",
+        "version": 1,
+        "channel": {"id": str(CHANNEL_ID), "type": 1, "recipients": [_user(uid)]},
+        "channel_id": str(CHANNEL_ID),
+        "user": _user(uid),
+        "message": _message(HOME_MESSAGE_ID),
+        "data": {"custom_id": custom_id, "component_type": 2},
+        "attachment_size_limit": 10 * 1024 * 1024,
+        "entitlements": [],
+        "locale": "en-US",
+    }
+
+def random_click(rng: random.Random, cluster_id: int) -> dict:
+    uid = FAKE_UID_BASE - cluster_id * FAKE_USERS - rng.randrange(FAKE_USERS)
+    custom_ids, weights = zip(*HOME_CLICKS)
+    return home_click(uid, rng.choices(custom_ids, weights)[0])
+
+def fake_uid_range(cluster_id: int) -> tuple[int, int]:
+    """Lowest and highest id the virtual players of `cluster_id` use."""
+    highest = FAKE_UID_BASE - cluster_id * FAKE_USERS
+    return highest - FAKE_USERS + 1, highest
+
+def _json_response(payload) -> web.Response:
+    # discord.py only parses JSON when the content type is exactly application/json
+    return web.Response(body=json.dumps(payload).encode(), content_type="application/json")
+
+class FakeDiscordAPI:
+    """Answers the REST calls the bot makes after a random latency, counting them by route."""
+
+    def __init__(self, latency: float = FAKE_API_LATENCY):
+        self.latency = latency
+        self.calls = defaultdict(int)
+        self.responded = set()  # interaction ids that got their initial response
+        self._runner = None
+
+    async def start(self) -> str:
+        """Start listening on a free local port; returns the base URL for discord.http.Route.BASE."""
+        app = web.Application()
+        app.router.add_route("*", "/api/v10/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/api/v10"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        parts = request.match_info["path"].split("/")
+        body = await request.json() if request.can_read_body and request.content_type == "application/json" else {}
+        await asyncio.sleep(random.expovariate(1 / self.latency) if self.latency > 0 else 0)
+
+        if parts == ["users", "@me"]:
+            return self._json("login", BOT_USER)
+        if parts == ["oauth2", "applications", "@me"]:
+            return self._json("application_info", {
+                "id": str(APPLICATION_ID), "name": "casino", "icon": None, "description": "",
+                "bot_public": False, "bot_require_code_grant": False, "owner": BOT_USER,
+                "verify_key": "", "team": None, "flags": 0, "summary": "",
+            })
+        if parts[0] == "applications" and parts[-1] == "commands":
+            return self._json("command_sync", [])
+        if parts[0] == "interactions" and parts[-1] == "callback":
+            return self._callback(int(parts[1]), body)
+        if parts[0] == "webhooks":
+            # Followups and edits of an interaction's messages
+            message_id = next(_snowflakes) if len(parts) == 3 else parts[-1]
+            return self._json(f"webhook_{request.method.lower()}", _message(HOME_MESSAGE_ID if message_id == "@original" else message_id, body))
+        if parts[0] == "channels" and "messages" in parts:
+            return self._json(f"message_{request.method.lower()}", _message(parts[3] if len(parts) > 3 else next(_snowflakes), body))
+        self.calls[f"unknown {request.method} /{parts[0]}"] += 1
+        return _json_response({})
+
+    def _callback(self, interaction_id: int, body: dict) -> web.Response:
+        self.responded.add(interaction_id)
+        kind = body.get("type")
+        payload = {"interaction": {"id": str(interaction_id), "type": 3}}
+        if kind in (4, 7):  # channel message / update message
+            payload["resource"] = {"type": kind, "message": _message(next(_snowflakes), body.get("data"))}
+        return self._json(f"callback_{kind}", payload)
+
+    def _json(self, route: str, payload) -> web.Response:
+        self.calls[route] += 1
+        return _json_response(payload)
+
+async def feed_clicks(bot: discord.Client, rate: float, seconds: float, cluster_id: int = 0) -> list[int]:
+    """
+    Deliver random home screen clicks at `rate` per second for `seconds`,
+    the way the gateway would: socket_event_type, then the INTERACTION_CREATE
+    parser. Returns the interaction ids sent.
+    """
+    parse = bot._connection.parsers["INTERACTION_CREATE"]
+    rng = random.Random()
+    sent = []
+    tick = 0.05
+    owed = 0.0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        owed += rate * tick
+        while owed >= 1:
+            payload = random_click(rng, cluster_id)
+            bot.dispatch("socket_event_type", "INTERACTION_CREATE")
+            parse(payload)
+            sent.append(int(payload["id"]))
+            owed -= 1
+        await asyncio.sleep(tick)
+    return sent
+
+async def delete_fake_players(cluster_id: int = 0):
+    """Remove the rows the virtual players of `cluster_id` left behind."""
+    first_uid, last_uid = fake_uid_range(cluster_id)
+    async with database.acquire("fake_cleanup") as conn:
+        for table in ("logs", "game_stats_daily", "casino_cooldowns", "casino_sessions", "user_accounts"):
+            await conn.execute(f"DELETE FROM {table} WHERE user_id BETWEEN $1 AND $2", first_uid, last_uid)
+    database.account_cache.clear()
@@ -0,0 +1,83 @@
+import discord
+from database import acquire
+
+# Admin statistics read the game_stats_daily rollup that settle_game keeps up
+# to date, so they cost one small aggregate per query no matter how big
+# `logs` grows (one row per user, game and day).
+
+STATS_DAYS = 7
+TOP_PLAYERS = 10
+MIN_ROUNDS = 20  # players with fewer rounds are left out of the win rate ranking
+
+GAME_LABELS = {
+    "slots": "🎰 Slots",
+    "blackjack": "🃏 Blackjack",
+    "wheel_of_fortune": "🎡 Fortune Wheel",
+}
+
+async def get_game_totals(days: int = STATS_DAYS) -> list[dict]:
+    """Per-game totals over the last `days` days (today included)."""
+    async with acquire("get_game_totals") as conn:
+        rows = await conn.fetch(
+            """
+            SELECT source, SUM(rounds)::bigint AS rounds, SUM(wins)::bigint AS wins,
+                   SUM(bets)::bigint AS bets, SUM(net_delta)::bigint AS net_delta,
+                   COUNT(DISTINCT user_id) AS players
+            FROM game_stats_daily
+            WHERE day > CURRENT_DATE - $1::integer
+            GROUP BY source
+            ORDER BY source
+            """,
+            days
+        )
+    return [dict(row) for row in rows]
+
+async def get_top_players(days: int = STATS_DAYS, limit: int = TOP_PLAYERS) -> list[dict]:
+    """Players with the best win rate over the last `days` days."""
+    async with acquire("get_top_players") as conn:
+        rows = await conn.fetch(
+            """
+            SELECT s.user_id, ua.username, SUM(s.rounds)::bigint AS rounds,
+                   SUM(s.wins)::bigint AS wins, SUM(s.net_delta)::bigint AS net_delta
+            FROM game_stats_daily s
+            LEFT JOIN user_accounts ua ON ua.user_id = s.user_id
+            WHERE s.day > CURRENT_DATE - $1::integer
+            GROUP BY s.user_id, ua.username
+            HAVING SUM(s.rounds) >= $3
+            ORDER BY SUM(s.wins)::float / SUM(s.rounds) DESC, SUM(s.net_delta) DESC
+            LIMIT $2
+            """,
+            days, limit, MIN_ROUNDS
+        )
+    return [dict(row) for row in rows]
+
+def build_stats_embed(totals: list[dict], players: list[dict], days: int = STATS_DAYS) -> discord.Embed:
+    embed = discord.Embed(title=f"📊 Statistics (last {days} days)", color=discord.Color.blurple())
+    if not totals:
+        embed.description = "No games played yet."
+        return embed
+
+    for game in totals:
+        win_rate = game["wins"] / game["rounds"] if game["rounds"] else 0
+        # net_delta is from the players' side; the house gains the opposite
+        embed.add_field(
+            name=GAME_LABELS.get(game["source"], game["source"]),
+            value=(
+                f"Rounds: {game['rounds']} | Players: {game['players']}\n"
+                f"Bets: {game['bets']} | Win rate: {win_rate:.1%}\n"
+                f"Paid to players: {game['net_delta']} | House: {-game['net_delta']}"
+            ),
+            inline=False
+        )
+
+    if players:
+        lines = [
+            f"**{i+1}.** {p['username'] or p['user_id']} - {p['wins'] / p['rounds']:.1%} "
+            f"of {p['rounds']} rounds, net {p['net_delta']}"
+            for i, p in enumerate(players)
+        ]
+        embed.add_field(name=f"🏅 Best win rates (min {MIN_ROUNDS} rounds)", value="\n".join(lines), inline=False)
+    return embed
+
+async def stats_embed(days: int = STATS_DAYS) -> discord.Embed:
+    return build_stats_embed(await get_game_totals(days), await get_top_players(days), days)
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+import discord
+from database import acquire
+
+# Leaderboard reads use the (balance, user_id) index (migrations/0005):
+# the top N is an index range scan with LIMIT, and a user's rank is the number
+# of accounts with a higher balance, counted from the same index.
+
+LEADERBOARD_SIZE = 5
+LEADERBOARD_TTL = float(os.getenv("LEADERBOARD_TTL", "10"))  # seconds
+
+# Top-N snapshot shared by every click within the TTL window
+_top_snapshot = []
+_top_expires = 0.0
+_refresh_lock = asyncio.Lock()
+
+async def get_top_users(limit: int = LEADERBOARD_SIZE) -> list[dict]:
+    """Return the top `limit` accounts by balance (user_id, username, balance)."""
+    if limit > LEADERBOARD_SIZE:
+        return await _fetch_top(limit)
+
+    global _top_snapshot, _top_expires
+    if time.monotonic() >= _top_expires:
+        async with _refresh_lock:
+            # Another click may have refreshed it while we waited
+            if time.monotonic() >= _top_expires:
+                _top_snapshot = await _fetch_top(LEADERBOARD_SIZE)
+                _top_expires = time.monotonic() + LEADERBOARD_TTL
+    return _top_snapshot[:limit]
+
+async def _fetch_top(limit: int) -> list[dict]:
+    async with acquire("fetch_top") as conn:
+        rows = await conn.fetch(
+            """
+            SELECT user_id, username, balance
+            FROM user_accounts
+            ORDER BY balance DESC, user_id DESC
+            LIMIT $1
+            """,
+            limit
+        )
+    return [dict(row) for row in rows]
+
+async def get_user_rank(user_id: int) -> int | None:
+    """Return the 1-based rank of a user by balance, or None if they have no account."""
+    async with acquire("get_user_rank") as conn:
+        return await conn.fetchval(
+            """
+            SELECT 1 + (SELECT COUNT(*) FROM user_accounts o WHERE o.balance > u.balance)
+            FROM user_accounts u
+            WHERE u.user_id = $1
+            """,
+            user_id
+        )
+
+def invalidate_leaderboard():
+    global _top_expires
+    _top_expires = 0.0
+
+def build_leaderboard_embed(rows: list[dict], user_rank: int | None = None) -> discord.Embed:
+    leaderboard = [f"**#1 {rows[0]['username']}** - {rows[0]['balance']}$"]
+    leaderboard += [f"**#{i+2}** {row['username']}" for i, row in enumerate(rows[1:LEADERBOARD_SIZE])]
+
+    embed = discord.Embed(
+        title="🏆 Top 5 Leaders",
+        description="\n".join(leaderboard),
+        color=discord.Color.gold()
+    )
+
+    if user_rank and user_rank > LEADERBOARD_SIZE:
+        embed.set_footer(text=f"Your rank: #{user_rank}")
+    return embed
+
+async def leaderboard_for(user_id: int) -> discord.Embed | None:
+    """Build the leaderboard embed for a user, or None when there are no accounts yet."""
+    rows = await get_top_users()
+    if not rows:
+        return None
+
+    # Users on the board already know their place; only look up everyone else
+    user_rank = None
+    if all(row["user_id"] != user_id for row in rows):
+        user_rank = await get_user_rank(user_id)
+    return build_leaderboard_embed(rows, user_rank)
@@ -0,0 +1,367 @@
+"""
+Headless load test for the bot.
+
+Drives virtual players through the real view callbacks (home buttons, slots,
+blackjack, fortune wheel) against a Postgres database, with stand-in Discord
+objects that add configurable HTTP latency and 429s instead of talking to
+Discord:
+
+    python load_harness.py --dsn postgresql://casino@localhost/casino_load
+    python load_harness.py --dsn ... --users 5000 --duration 120 --latency-ms 120 --rate-limit 0.02
+    python load_harness.py --dsn ... --coordination postgres   # the multi-cluster code paths
+
+Reports throughput, p50/p99 per action, first-response times, pool saturation
+and per-user queue (lock) contention. Virtual players get negative ids
+(--uid-base up to --uid-base + --users - 1), which no Discord user can have,
+and exactly that range is deleted afterwards unless --keep is given. The
+database must be given explicitly; point it at a scratch database, not
+production.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import defaultdict
+
+import discord
+
+import coordination
+import database
+import metrics
+from blackjack import BlackjackBetView
+from database import get_pool_stats
+from main import CasinoHomeView
+from migrate import migrate
+from slots import SlotView
+from task_supervisor import drain as drain_game_tasks, get_task_stats
+from user_executor import drain as drain_user_steps, get_executor_stats
+
+# Relative weights of what a virtual player does next
+ACTIONS = {
+    "slots": 40,
+    "blackjack": 25,
+    "wheel": 10,
+    "balance": 10,
+    "leaderboard": 10,
+    "daily": 5,
+}
+SLOT_BETS = ("spin", "bet50", "bet100", "bet500", "bet1000")
+BLACKJACK_BETS = ("free", "bet50", "bet100", "bet500")
+BLACKJACK_STAND_ON = 17
+BLACKJACK_MAX_HITS = 10  # a failing Hit button must not loop forever
+
+# --- Stand-in Discord objects ---
+
+FAKE_WEBHOOK_ID = 1000000000000000001  # interaction webhooks use the application id
+
+class FakeHTTP:
+    """Every Discord call goes through here: latency, simulated 429s and call counts."""
+    def __init__(self, latency: float, jitter: float, rate_limit: float, retry_after: float, rng: random.Random):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rng = rng
+        self.calls = defaultdict(int)
+        self.rate_limited = 0
+        # Interaction responses, edits and followups all go through discord.py's
+        # webhook adapter, so that's the logger and message a real 429 produces
+        self._log = logging.getLogger("discord.webhook.async_")
+
+    async def request(self, route: str):
+        self.calls[route] += 1
+        while self.rate_limit and self.rng.random() < self.rate_limit:
+            # discord.py sleeps and retries on its own, logging a warning each time
+            self.rate_limited += 1
+            self._log.warning("Webhook ID %s is rate limited. Retrying in %.2f seconds.", FAKE_WEBHOOK_ID, self.retry_after)
+            await asyncio.sleep(self.retry_after)
+        await asyncio.sleep(max(0.0, self.rng.gauss(self.latency, self.jitter)))
+
+class FakeUser:
+    def __init__(self, uid: int, name: str):
+        self.id = uid
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{uid}>"
+
+class FakeMessage:
+    _next_id = 1
+
+    def __init__(self, http: FakeHTTP, content=None, embed=None, view=None):
+        self.id = FakeMessage._next_id
+        FakeMessage._next_id += 1
+        self.http = http
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.edits = 0
+
+    async def edit(self, *, content=discord.utils.MISSING, embed=discord.utils.MISSING, view=discord.utils.MISSING, **kwargs):
+        await self.http.request("edit_message")
+        self.edits += 1
+        if content is not discord.utils.MISSING:
+            self.content = content
+        if embed is not discord.utils.MISSING:
+            self.embed = embed
+        if view is not discord.utils.MISSING:
+            self.view = view
+        return self
+
+class FakeWebhook:
+    """interaction.followup: interaction followups always return the message."""
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, *, embed=None, view=None, ephemeral=False, wait=True, **kwargs):
+        await self.interaction.http.request("followup_send")
+        message = FakeMessage(self.interaction.http, content, embed, view)
+        self.interaction.sent.append(message)
+        return message
+
+# Timed like discord.InteractionResponse, so first-response latency is measured
+@metrics.instrument_response
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def _respond(self, route: str):
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        # Marked before the round trip, like discord.py, so a second response fails fast
+        self._done = True
+        await self.interaction.http.request(route)
+
+    async def defer(self, *, ephemeral=False, thinking=False):
+        await self._respond("defer")
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral=False, **kwargs):
+        await self._respond("send_message")
+        self.interaction.original = FakeMessage(self.interaction.http, content, embed, view)
+        self.interaction.sent.append(self.interaction.original)
+
+    async def edit_message(self, *, content=discord.utils.MISSING, embed=discord.utils.MISSING, view=discord.utils.MISSING, **kwargs):
+        await self._respond("edit_message")
+        await self.interaction.original.edit(content=content, embed=embed, view=view)
+
+class FakeInteraction:
+    def __init__(self, http: FakeHTTP, user: FakeUser, message: FakeMessage = None):
+        self.http = http
+        self.user = user
+        self.message = message
+        self.data = {}
+        # A component interaction's original response is the message it came from
+        self.original = message or FakeMessage(http)
+        self.sent = []  # messages created by this interaction, oldest first
+        self.response = FakeResponse(self)
+        self.followup = FakeWebhook(self)
+
+    async def original_response(self):
+        return self.original
+
+    async def edit_original_response(self, **kwargs):
+        return await self.original.edit(**kwargs)
+
+# --- Virtual players ---
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # action -> seconds from click to callback return
+        self.errors = defaultdict(int)
+        self.rejected = defaultdict(int)  # cooldowns, sessions still open, not enough coins
+
+    def record(self, action: str, seconds: float, interaction: FakeInteraction):
+        self.latencies[action].append(seconds)
+        text = " ".join(str(m.content) for m in interaction.sent if m.content)
+        if any(marker in text for marker in ("⏱️", "⚠️", "❌")):
+            self.rejected[action] += 1
+
+async def click(results: Results, action: str, view: discord.ui.View, name: str, interaction: FakeInteraction):
+    """Run a button the way View._scheduled_task does: interaction_check, then the callback."""
+    start = time.perf_counter()
+    try:
+        if await view.interaction_check(interaction):
+            await getattr(view, name).callback(interaction)
+    except Exception as e:
+        results.errors[f"{action}: {type(e).__name__}: {e}"] += 1
+    results.record(action, time.perf_counter() - start, interaction)
+    return interaction
+
+class Player:
+    def __init__(self, uid: int, http: FakeHTTP, home: CasinoHomeView, rng: random.Random):
+        self.user = FakeUser(uid, f"load_{uid % 1_000_000}")
+        self.http = http
+        self.home = home
+        self.rng = rng
+        self.slot_view = None
+
+    def interaction(self, message: FakeMessage = None) -> FakeInteraction:
+        return FakeInteraction(self.http, self.user, message)
+
+    async def play_slots(self, results: Results):
+        if self.slot_view is None:
+            opened = await click(results, "open_slots", self.home, "goto_slots", self.interaction())
+            self.slot_view = opened.original.view
+        interaction = await click(
+            results, "slots", self.slot_view, self.rng.choice(SLOT_BETS), self.interaction(self.slot_view.msg)
+        )
+        # Each spin answers with a fresh SlotView; keep playing from that one
+        for message in interaction.sent:
+            if isinstance(message.view, SlotView) and message.view.msg is message:
+                self.slot_view = message.view
+
+    async def play_blackjack(self, results: Results):
+        bets = BlackjackBetView()
+        interaction = await click(results, "blackjack_start", bets, self.rng.choice(BLACKJACK_BETS), self.interaction())
+        table = next((m.view for m in interaction.sent if m.view is not None), None)
+        if table is None:
+            return
+        for _ in range(BLACKJACK_MAX_HITS):
+            if table.game_over or table.player_hand.total >= BLACKJACK_STAND_ON:
+                break
+            await click(results, "blackjack_hit", table, "hit", self.interaction(table.message))
+        if not table.game_over:
+            await click(results, "blackjack_stand", table, "stand", self.interaction(table.message))
+
+    async def play_wheel(self, results: Results):
+        opened = await click(results, "open_wheel", self.home, "goto_fortune", self.interaction())
+        await click(results, "wheel", opened.original.view, "spin", self.interaction(opened.original))
+
+    async def act(self, action: str, results: Results):
+        if action == "slots":
+            await self.play_slots(results)
+        elif action == "blackjack":
+            await self.play_blackjack(results)
+        elif action == "wheel":
+            await self.play_wheel(results)
+        elif action == "balance":
+            await click(results, "balance", self.home, "check_balance", self.interaction())
+        elif action == "leaderboard":
+            await click(results, "leaderboard", self.home, "leaders", self.interaction())
+        elif action == "daily":
+            await click(results, "daily", self.home, "daily_reward", self.interaction())
+
+async def run_player(player: Player, results: Results, deadline: float, think: float):
+    # Spread the arrivals over the first think interval
+    await asyncio.sleep(player.rng.uniform(0, think))
+    actions, weights = zip(*ACTIONS.items())
+    while time.monotonic() < deadline:
+        await player.act(player.rng.choices(actions, weights)[0], results)
+        await asyncio.sleep(player.rng.expovariate(1 / think) if think > 0 else 0)
+
+async def _cleanup(first_uid: int, last_uid: int):
+    """Delete the virtual players' rows: only ids in [first_uid, last_uid]."""
+    async with database.acquire("load_cleanup") as conn:
+        for table in ("logs", "game_stats_daily", "casino_cooldowns", "casino_sessions", "user_accounts"):
+            await conn.execute(f"DELETE FROM {table} WHERE user_id BETWEEN $1 AND $2", first_uid, last_uid)
+    database.account_cache.clear()
+
+# --- Report ---
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def report(results: Results, http: FakeHTTP, elapsed: float, users: int):
+    total = sum(len(v) for v in results.latencies.values())
+    print(f"\n{users} players, {elapsed:.1f}s: {total} clicks, {total / elapsed:.1f} clicks/s")
+    print(f"{'action':<18} {'count':>7} {'per s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'rejected':>9}")
+    for action, values in sorted(results.latencies.items()):
+        print(
+            f"{action:<18} {len(values):>7} {len(values) / elapsed:>8.1f} {percentile(values, 0.5) * 1000:>8.0f} "
+            f"{percentile(values, 0.99) * 1000:>8.0f} {max(values) * 1000:>8.0f} {results.rejected[action]:>9}"
+        )
+
+    print("\nFirst response (interaction_check -> response)")
+    for game, series in sorted(metrics.interaction_first_response.series.items()):
+        q = metrics.interaction_first_response.quantile
+        print(f"  {game:<18} p50 {q(0.5, game) * 1000:.0f}ms  p99 {q(0.99, game) * 1000:.0f}ms  n={series.count}")
+
+    print("\nDatabase (connection hold time per operation)")
+    for name, series in sorted(metrics.db_query_seconds.series.items()):
+        q = metrics.db_query_seconds.quantile
+        print(f"  {name:<24} p50 {q(0.5, name) * 1000:.1f}ms  p99 {q(0.99, name) * 1000:.1f}ms  n={series.count}")
+    pool = get_pool_stats()
+    print(
+        f"Pool: max in use {pool['max_in_use']}/{pool.get('max_size', 0)}, acquires {pool['acquires']}, "
+        f"wait avg {pool['avg_wait_ms']:.1f}ms max {pool['max_wait_ms']:.1f}ms, timeouts {pool['timeouts']}"
+    )
+
+    ex = get_executor_stats()
+    print(
+        f"User queues: {ex['steps_run']} steps, {ex['steps_waited']} waited behind another step, "
+        f"wait avg {ex['avg_wait_ms']:.1f}ms max {ex['max_wait_ms']:.1f}ms"
+    )
+    tasks = get_task_stats()
+    print(f"Game tasks: {tasks['started']} started, {tasks['failed']} failed, {tasks['rejected']} rejected at the limit")
+
+    calls = ", ".join(f"{route} {n}" for route, n in sorted(http.calls.items()))
+    counted = sum(metrics.discord_rate_limits.values.values())
+    print(f"Discord: {calls} | 429s {http.rate_limited} (casino_discord_rate_limits_total {counted:.0f})")
+    if results.errors:
+        print("\nErrors")
+        for error, n in sorted(results.errors.items(), key=lambda kv: -kv[1])[:20]:
+            print(f"  {n:>6} × {error}")
+
+async def run(args):
+    database.DB_DSN = args.dsn
+    coordination.COORDINATION_BACKEND = args.coordination
+    rng = random.Random(args.seed)
+    http = FakeHTTP(args.latency_ms / 1000, args.jitter_ms / 1000, args.rate_limit, args.retry_after, rng)
+
+    await database.init_pool()
+    try:
+        await migrate(database.get_pool())
+        await coordination.init_coordination()
+        metrics.install_rate_limit_handler()
+
+        home = CasinoHomeView()
+        players = [Player(args.uid_base + i, http, home, random.Random(rng.random())) for i in range(args.users)]
+        results = Results()
+        print(
+            f"🧪 {args.users} players for {args.duration:.0f}s, think {args.think:.1f}s, "
+            f"Discord latency {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, 429 rate {args.rate_limit:.1%}, "
+            f"coordination {args.coordination}",
+            flush=True
+        )
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(*(run_player(p, results, deadline, args.think) for p in players))
+        elapsed = time.monotonic() - start
+        # Slot spins settle and animate in background tasks and other games in user
+        # queues; let them finish before cleanup
+        await asyncio.gather(drain_game_tasks(15), drain_user_steps(15))
+        report(results, http, elapsed, args.users)
+    finally:
+        await coordination.close_coordination()
+        if not args.keep:
+            await _cleanup(args.uid_base, args.uid_base + args.users - 1)
+        await database.get_pool().close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the casino views against Postgres")
+    parser.add_argument("--dsn", required=True, help="scratch database to use (never the production one)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--think", type=float, default=2.0, help="mean seconds between a player's actions")
+    parser.add_argument("--latency-ms", type=float, default=80, help="mean Discord API latency")
+    parser.add_argument("--jitter-ms", type=float, default=30)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="chance that a Discord call gets a 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="seconds a 429 makes the call wait")
+    parser.add_argument("--coordination", choices=("local", "postgres"), default=os.getenv("CASINO_COORDINATION", "local"))
+    parser.add_argument("--uid-base", type=int, default=-1_000_000_000, help="first virtual player id (must keep all ids negative)")
+    parser.add_argument("--keep", action="store_true", help="keep the virtual players' rows afterwards")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    # Negative ids can't collide with real (snowflake) user ids
+    if args.uid_base + args.users - 1 >= 0:
+        parser.error("--uid-base + --users - 1 must be negative")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import re
+from datetime import date, datetime, timezone
+from database import acquire
+
+# --- Partitioned logs ---
+# `logs` is range-partitioned by created_at into one table per month
+# (logs_p2026_01, ...; created by migrations/0002_partitioned_logs.sql).
+# Partitions are created LOG_PARTITIONS_AHEAD months in advance, and
+# partitions older than LOG_RETENTION_MONTHS are rolled up into
+# logs_monthly_summary and dropped, so inserts and index sizes stay flat.
+# logs_default (migrations/0007) takes rows for months that have no
+# partition yet; the job moves them out when it creates the month.
+
+LOG_RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", "6"))
+LOG_PARTITIONS_AHEAD = int(os.getenv("LOG_PARTITIONS_AHEAD", "3"))
+LOG_MAINTENANCE_INTERVAL = float(os.getenv("LOG_MAINTENANCE_INTERVAL", str(6 * 3600)))  # seconds
+
+_PARTITION_NAME = re.compile(r"^logs_p(\d{4})_(\d{2})$")
+
+_maintenance_task = None
+
+def _month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+def _current_month() -> date:
+    return _month_start(datetime.now(timezone.utc))
+
+def partition_name(month: date) -> str:
+    return f"logs_p{month.year:04d}_{month.month:02d}"
+
+async def ensure_log_partitions(conn, first_month: date = None):
+    """
+    Create monthly partitions from first_month (default: this month, or the
+    oldest month with rows in logs_default) up to LOG_PARTITIONS_AHEAD ahead.
+    Run inside a transaction holding the casino.logs_setup lock.
+    """
+    current = _current_month()
+    month = first_month or current
+    has_default = await conn.fetchval("SELECT to_regclass('logs_default')") is not None
+    if has_default:
+        oldest = await conn.fetchval("SELECT min(created_at) FROM logs_default")
+        if oldest is not None:
+            month = min(month, _month_start(oldest))
+    last = _add_months(current, LOG_PARTITIONS_AHEAD)
+    while month <= last:
+        name = partition_name(month)
+        if await conn.fetchval("SELECT to_regclass($1)", name) is None:
+            await _create_partition(conn, name, month, _add_months(month, 1), has_default)
+        month = _add_months(month, 1)
+
+async def _create_partition(conn, name: str, start: date, end: date, has_default: bool):
+    create = f"CREATE TABLE {name} PARTITION OF logs FOR VALUES FROM ('{start}') TO ('{end}')"
+    if not has_default or not await conn.fetchval(
+        "SELECT EXISTS (SELECT 1 FROM logs_default WHERE created_at >= $1 AND created_at < $2)", start, end
+    ):
+        await conn.execute(create)
+        return
+    # Postgres refuses a partition whose rows sit in the default one, so
+    # detach the default, create the month, move its rows over and reattach
+    await conn.execute("ALTER TABLE logs DETACH PARTITION logs_default")
+    await conn.execute(create)
+    moved = await conn.execute(f"""
+        WITH moved AS (
+            DELETE FROM logs_default WHERE created_at >= $1 AND created_at < $2 RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """, start, end)
+    await conn.execute("ALTER TABLE logs ATTACH PARTITION logs_default DEFAULT")
+    print(f"🗂️ Created log partition {name} and moved {moved.split()[-1]} row(s) into it from logs_default", flush=True)
+
+async def roll_up_old_partitions() -> list[str]:
+    """Summarize and drop partitions older than LOG_RETENTION_MONTHS. Returns the dropped names."""
+    cutoff = _add_months(_current_month(), -LOG_RETENTION_MONTHS)
+    dropped = []
+    async with acquire("roll_up_old_partitions") as conn:
+        names = await conn.fetch("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'logs'::regclass
+        """)
+        for row in sorted(r["relname"] for r in names):
+            match = _PARTITION_NAME.match(row)
+            if match is None:
+                continue
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if month >= cutoff:
+                continue
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext('casino.logs_setup'))")
+                if await conn.fetchval("SELECT to_regclass($1)", row) is None:
+                    continue  # another process already dropped it
+                # Upsert, so a retry after a failed drop doesn't double count
+                await conn.execute(f"""
+                    INSERT INTO logs_monthly_summary (month, user_id, source, rounds, bets, net_delta)
+                    SELECT $1::date, user_id, COALESCE(source, ''), count(*),
+                           COALESCE(sum(bet_amount), 0), COALESCE(sum(delta), 0)
+                    FROM {row}
+                    GROUP BY user_id, COALESCE(source, '')
+                    ON CONFLICT (month, user_id, source) DO UPDATE
+                    SET rounds = EXCLUDED.rounds, bets = EXCLUDED.bets, net_delta = EXCLUDED.net_delta
+                """, month)
+                await conn.execute(f"ALTER TABLE logs DETACH PARTITION {row}")
+                await conn.execute(f"DROP TABLE {row}")
+            dropped.append(row)
+    return dropped
+
+async def run_log_maintenance():
+    async with acquire("run_log_maintenance") as conn:
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext('casino.logs_setup'))")
+            await ensure_log_partitions(conn)
+    dropped = await roll_up_old_partitions()
+    if dropped:
+        print(f"🧹 Rolled up and dropped log partitions: {', '.join(dropped)}", flush=True)
+
+def start_log_maintenance():
+    """Start the periodic partition/retention job. Safe to call more than once."""
+    global _maintenance_task
+    if _maintenance_task is None or _maintenance_task.done():
+        _maintenance_task = asyncio.create_task(_maintenance_loop())
+
+async def stop_log_maintenance():
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        try:
+            await _maintenance_task
+        except asyncio.CancelledError:
+            pass
+        _maintenance_task = None
+
+async def _maintenance_loop():
+    while True:
+        try:
+            await run_log_maintenance()
+        except Exception as e:
+            print(f"Log maintenance failed: {e}", flush=True)
+        await asyncio.sleep(LOG_MAINTENANCE_INTERVAL)
@@ -1,58 +1,226 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import signal
 import time
 import os
-from datetime import datetime
-import traceback, requests
-from database import init_pool, get_pool, init_db, get_balance, update_balance, get_user_lock
+import traceback
+import metrics
+from database import init_pool, get_pool, get_pool_stats, get_meta, set_meta, get_balance, get_wheel_state, claim_daily_reward, DAILY_REWARD, start_username_sync, stop_username_sync
 from admin_console import AdminView
 from slots import SlotView
 from blackjack import BlackjackBetView
-from wheel_of_fortune import FortuneView, embed_wheel, get_wheel_state
+from wheel_of_fortune import FortuneView, embed_wheel
+from migrate import migrate
+from log_maintenance import start_log_maintenance, stop_log_maintenance
+from leaderboard import leaderboard_for
+from coordination import init_coordination, close_coordination, COORDINATION_BACKEND
+from alerts import start_alerts, stop_alerts, notify
+from task_supervisor import drain as drain_game_tasks, SHUTDOWN_GRACE
+from user_executor import drain as drain_user_steps
+from metrics import InstrumentedView, counted_edit, install_rate_limit_handler, start_metrics_server, stop_metrics_server, METRICS_PORT
 
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix=None, intents=intents)
-
-# Update last daily claim timestamp
-async def update_last_daily_claim(user_id: int, username: str, current_time: int) -> bool:
-    today = datetime.fromtimestamp(current_time).date()
-
-    async with get_pool().acquire() as conn:
-        # Insert user if not exists (Postgres syntax)
-        await conn.execute(
-            """
-            INSERT INTO user_accounts (user_id, username, balance, total_bet, last_daily_claim)
-            VALUES ($1, $2, 30000, 0, 0)
-            ON CONFLICT (user_id) DO NOTHING
-            """,
-            user_id, username
-        )
 
-        # Fetch last_daily_claim timestamp
-        row = await conn.fetchrow(
-            "SELECT last_daily_claim FROM user_accounts WHERE user_id = $1",
-            user_id
-        )
+# --- Deployment mode ---
+# CASINO_CLUSTERS=1 (default) runs one process that owns every shard.
+# With more clusters, a supervisor starts one worker process per cluster; each
+# owns a contiguous range of the CASINO_SHARD_COUNT shards and its own pool.
+CLUSTER_COUNT = int(os.getenv("CASINO_CLUSTERS", "1"))
+SHARD_COUNT = int(os.getenv("CASINO_SHARD_COUNT", "0")) or None
+EVENT_STATS_INTERVAL = float(os.getenv("CASINO_EVENT_STATS_INTERVAL", "60"))  # seconds
+# Stand-in gateway for testing the process layout without connecting to Discord
+FAKE_GATEWAY = os.getenv("CASINO_FAKE_GATEWAY") == "1"
+FAKE_EVENT_RATE = float(os.getenv("CASINO_FAKE_EVENT_RATE", "200"))  # clicks/s per shard
+FAKE_GATEWAY_SECONDS = float(os.getenv("CASINO_FAKE_GATEWAY_SECONDS", "30"))
+
+def command_tree_hash(tree: app_commands.CommandTree) -> str:
+    """Hash of the global command payload that tree.sync() would upload."""
+    payload = [command.to_dict(tree) for command in tree.get_commands()]
+    payload.sort(key=lambda command: command["name"])
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+class CasinoBot(commands.AutoShardedBot):
+    def __init__(self, cluster_id: int = 0, **kwargs):
+        super().__init__(command_prefix=None, intents=intents, **kwargs)
+        self.cluster_id = cluster_id
+        self.events_seen = 0
+        self._event_stats_task = None
+        self.tree.add_command(casino)
+        self.tree.add_command(admin)
+        self.launched_at = time.perf_counter()
+        self.startup_timings = {}  # phase -> ms
+        self.ready_count = 0
+        self._disconnected_at = {}  # shard_id -> perf_counter
+        self._shutdown_task = None
+
+    @property
+    def label(self) -> str:
+        if self.shard_ids:
+            return f"cluster {self.cluster_id} (shards {self.shard_ids[0]}-{self.shard_ids[-1]})"
+        return f"cluster {self.cluster_id}"
+
+    async def on_socket_event_type(self, event_type):
+        self.events_seen += 1
+
+    def start_event_stats(self):
+        if self._event_stats_task is None:
+            self._event_stats_task = asyncio.create_task(self._report_event_stats())
+
+    async def _report_event_stats(self):
+        last_count, last_time = self.events_seen, time.monotonic()
+        while True:
+            await asyncio.sleep(EVENT_STATS_INTERVAL)
+            now = time.monotonic()
+            rate = (self.events_seen - last_count) / (now - last_time)
+            pool = get_pool_stats()
+            print(
+                f"📈 {self.label}: {rate:.1f} events/s | pool {pool.get('size', 0)}/{pool.get('max_size', 0)}, "
+                f"in use {pool['in_use']} (max {pool['max_in_use']}), wait avg {pool['avg_wait_ms']:.1f}ms "
+                f"max {pool['max_wait_ms']:.1f}ms, timeouts {pool['timeouts']}",
+                flush=True
+            )
+            last_count, last_time = self.events_seen, now
+
+    def install_signal_handlers(self):
+        """SIGTERM (docker stop, the cluster supervisor) and SIGINT shut down gracefully instead of killing in-flight games."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._on_stop_signal, sig)
+
+    def _on_stop_signal(self, sig):
+        print(f"🛑 {signal.Signals(sig).name} received ({self.label}), shutting down", flush=True)
+        self._start_shutdown()
+
+    def _start_shutdown(self) -> asyncio.Task:
+        # A stop signal and bot.run's own cleanup can both ask; shut down once
+        if self._shutdown_task is None:
+            self._shutdown_task = asyncio.create_task(self._shutdown())
+        return self._shutdown_task
+
+    async def close(self):
+        await asyncio.shield(self._start_shutdown())
+
+    async def _shutdown(self):
+        if self._event_stats_task is not None:
+            self._event_stats_task.cancel()
+        # Let settles in progress (spin tasks and the wheel, blackjack and admin
+        # steps in user queues) finish while Discord and the pool are still up
+        await asyncio.gather(drain_game_tasks(SHUTDOWN_GRACE), drain_user_steps(SHUTDOWN_GRACE))
+        # Write out queued usernames before the connection pool goes away
+        await stop_username_sync()
+        await stop_log_maintenance()
+        await close_coordination()
+        await stop_metrics_server()
+        # Last, so errors while shutting down are still reported; needs the HTTP session
+        await stop_alerts()
+        await super().close()
+
+    async def _timed(self, phase: str, coro):
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.startup_timings[phase] = (time.perf_counter() - start) * 1000
+
+    def register_views(self):
+        global persistent_home_view
+        global persistent_admin_view
 
-        last_claim_date = None
-        if row and row['last_daily_claim'] is not None:
-            last_claim_date = datetime.fromtimestamp(row['last_daily_claim']).date()
+        if persistent_home_view is None:
+            persistent_home_view = CasinoHomeView()
+        if persistent_admin_view is None:
+            persistent_admin_view = AdminView(games=["Slots", "Blackjack", "Fortune Wheel"])
+
+        # Every cluster handles its own interactions, so each registers the views
+        self.add_view(persistent_home_view)
+        self.add_view(persistent_admin_view)
 
-        if last_claim_date == today:
-            # Already claimed today
+    async def sync_commands(self) -> bool:
+        """Sync the command tree only when its definition changed since the last sync."""
+        # Application commands are global: one cluster syncs them for all
+        if self.cluster_id != 0:
             return False
+        key = f"command_tree_hash:{self.application_id}"
+        digest = command_tree_hash(self.tree)
+        if await get_meta(key) == digest:
+            return False
+        await self.tree.sync()
+        await set_meta(key, digest)
+        return True
 
-        # Update last_daily_claim to now
-        await conn.execute(
-            "UPDATE user_accounts SET last_daily_claim = $1 WHERE user_id = $2",
-            current_time, user_id
+    async def setup_hook(self):
+        """One-time startup after login, before the gateway connects. Reconnects don't repeat it."""
+        start = time.perf_counter()
+        start_alerts()
+        self.install_signal_handlers()
+        try:
+            install_rate_limit_handler()
+            if METRICS_PORT:
+                # One endpoint per cluster process
+                await self._timed("metrics", start_metrics_server(METRICS_PORT + self.cluster_id))
+            await self._timed("pool", init_pool())
+            start_username_sync()
+
+            self.register_views()
+            migrations = await self._timed("migrations", migrate(get_pool()))
+            if migrations:
+                # Reconnect lazily so every connection warms up against the new schema
+                await get_pool().expire_connections()
+            # Both only need the schema; the sync is an HTTP round trip when it happens
+            _, synced = await asyncio.gather(
+                self._timed("coordination", init_coordination()),
+                self._timed("command sync", self.sync_commands()),
+            )
+            start_log_maintenance()
+            self.start_event_stats()
+        except Exception:
+            tb = traceback.format_exc()
+            print(tb, flush=True)
+            notify("Casino Bot Failed", tb)
+            raise
+
+        self.startup_timings["total"] = (time.perf_counter() - start) * 1000
+        print(
+            f"🟢 Setup done ({self.label}): {len(migrations)} migrations applied, "
+            f"commands {'synced' if synced else 'unchanged'}, coordination {COORDINATION_BACKEND}",
+            flush=True
         )
+        print("⏱️ Startup: " + " | ".join(f"{phase} {ms:.0f}ms" for phase, ms in self.startup_timings.items()), flush=True)
 
-        return True
+    async def on_ready(self):
+        # Fires again after every full reconnect; setup already ran in setup_hook
+        self.ready_count += 1
+        if self.ready_count == 1:
+            cold_start = (time.perf_counter() - self.launched_at) * 1000
+            self.startup_timings["cold start"] = cold_start
+            print(f"✅ {self.user} is ready! ({self.label}) cold start {cold_start:.0f}ms", flush=True)
+        else:
+            print(f"🔁 {self.user} is ready again ({self.label}), #{self.ready_count - 1} since start", flush=True)
+
+    async def on_shard_disconnect(self, shard_id: int):
+        self._disconnected_at.setdefault(shard_id, time.perf_counter())
+
+    async def on_shard_resumed(self, shard_id: int):
+        self._report_reconnect(shard_id)
+
+    async def on_shard_ready(self, shard_id: int):
+        self._report_reconnect(shard_id)
+
+    def _report_reconnect(self, shard_id: int):
+        disconnected_at = self._disconnected_at.pop(shard_id, None)
+        if disconnected_at is not None:
+            print(f"🔁 Shard {shard_id} reconnected in {(time.perf_counter() - disconnected_at) * 1000:.0f}ms", flush=True)
 
 # --- UI Views and Bot Commands ---
 
-class CasinoHomeView(discord.ui.View):
+class CasinoHomeView(InstrumentedView):
+    game = "home"
+
     def __init__(self):
         super().__init__(timeout=None)  # Persistent buttons
 
@@ -65,7 +233,7 @@ class CasinoHomeView(discord.ui.View):
         )
         msg = await interaction.original_response()
         slot_view = SlotView(msg)
-        await msg.edit(view=slot_view)
+        await counted_edit(msg.edit(view=slot_view))
         
     @discord.ui.button(label="🃏 Go to Blackjack", style=discord.ButtonStyle.success, custom_id="goto_blackjack")
     async def goto_blackjack(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -89,25 +257,16 @@ class CasinoHomeView(discord.ui.View):
     async def daily_reward(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=True)
 
-        uid = interaction.user.id
-        lock = get_user_lock(uid)
-
-        async with lock:
-            now = int(time.time())
-            success = await update_last_daily_claim(uid, interaction.user.name, now)
-
-            if not success:
-                await interaction.followup.send(
-                    "🕒 You already claimed your daily reward today. Try again tomorrow!", ephemeral=True
-                )
-                return
-
-            # Add 3000 coins to balance
-            await update_balance(uid, 3000, 0)
-
+        balance = await claim_daily_reward(interaction.user.id, interaction.user.name, int(time.time()))
+        if balance is None:
             await interaction.followup.send(
-                "✅ You claimed your daily reward of 3000 coins!", ephemeral=True
+                "🕒 You already claimed your daily reward today. Try again tomorrow!", ephemeral=True
             )
+            return
+
+        await interaction.followup.send(
+            f"✅ You claimed your daily reward of {DAILY_REWARD} coins!\n💰 Balance: {balance}", ephemeral=True
+        )
 
     @discord.ui.button(label="💰 Check Balance", style=discord.ButtonStyle.primary, custom_id="check_balance_main", row = 1)
     async def check_balance(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -118,90 +277,18 @@ class CasinoHomeView(discord.ui.View):
     
     @discord.ui.button(label="👑 Leaderboard", style=discord.ButtonStyle.primary, custom_id="top_5", row=1)
     async def leaders(self, interaction: discord.Interaction, button: discord.ui.Button):
-        async with get_pool().acquire() as conn:
-            rows = await conn.fetch(
-                "SELECT user_id, username, balance FROM user_accounts ORDER BY balance DESC"
-            )
-
-        if not rows:
+        embed = await leaderboard_for(interaction.user.id)
+        if embed is None:
             await interaction.response.send_message("No one gambled yet :(", ephemeral=True)
             return
 
-        leaderboard = [f"**#1 {rows[0]['username']}** - {rows[0]['balance']}$"]
-        leaderboard += [f"**#{i+2}** {row['username']}" for i, row in enumerate(rows[1:5])]
-
-        leaderboard_text = "\n".join(leaderboard)
-
-        user_id = interaction.user.id
-        user_rank = None
-        for i, row in enumerate(rows):
-            if row["user_id"] == user_id:
-                user_rank = i + 1
-                break
-
-        embed = discord.Embed(
-            title="🏆 Top 5 Leaders",
-            description=leaderboard_text,
-            color=discord.Color.gold()
-        )
-
-        if user_rank and user_rank > 5:
-            embed.set_footer(text=f"Your rank: #{user_rank}")
-
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 persistent_home_view = None
 persistent_admin_view = None
 
-WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_ALERT")
-PING_UID = os.getenv("MY_DISCORD_UID")
-
-def notify_crash(message: str):
-    if not WEBHOOK_URL:
-        print("DISCORD_WEBHOOK_ALERT not set", flush=True)
-        return
-    payload = {
-        "content": f"<@{PING_UID}> 🚨 **Casino Bot Failed**\n```{message}```"
-    }
-    try:
-        requests.post(WEBHOOK_URL, json=payload, timeout=5)
-    except Exception as e:
-        print(f"Webhook failed: {e}", flush=True)
-
-@bot.event
-async def on_ready():
-    print("🟡 on_ready started", flush=True)
-    try:
-        await init_pool()
-        print("🟢 Pool initialized", flush=True)
-
-        global persistent_home_view
-        global persistent_admin_view
-
-        if persistent_home_view is None:
-            persistent_home_view = CasinoHomeView()
-            print("🟢 Home view created", flush=True)
-        if persistent_admin_view is None:
-            persistent_admin_view = AdminView(games=["Slots", "Blackjack", "Fortune Wheel"])
-            print("🟢 Admin view created", flush=True)
-
-        bot.add_view(persistent_home_view)
-        bot.add_view(persistent_admin_view)
-        print("🟢 Views added", flush=True)
-
-        await init_db()
-        print("🟢 DB initialized", flush=True)
-
-        await bot.tree.sync()
-        print(f"✅ {bot.user} is ready!", flush=True)
-    except Exception:
-        tb = traceback.format_exc()
-        print(tb, flush=True)
-        notify_crash(tb)
-        raise
-
 # Slash command to show the casino home screen message publicly
-@bot.tree.command(name="casino", description="Open the Casino home screen")
+@app_commands.command(name="casino", description="Open the Casino home screen")
 async def casino(interaction: discord.Interaction):
     await interaction.response.send_message(
         embed=discord.Embed(title="🎮 Casino Home", description="Click buttons below to play!"),
@@ -210,7 +297,7 @@ async def casino(interaction: discord.Interaction):
     )
 
 # Slash command to show the casino home screen message publicly
-@bot.tree.command(name="admin", description="Open the Admin Console")
+@app_commands.command(name="admin", description="Open the Admin Console")
 async def admin(interaction: discord.Interaction):
     await interaction.response.send_message(
         embed=discord.Embed(title="👮🏼 Admin Console", description="Click buttons below to play!"),
@@ -218,7 +305,119 @@ async def admin(interaction: discord.Interaction):
         ephemeral=False
     )
 
-token = os.getenv("CASINO_TOKEN")
-if not token:
-    raise RuntimeError("CASINO_TOKEN is not set in environment variables.")
-bot.run(token)
+# --- Process entry points ---
+
+async def run_fake_gateway(bot: CasinoBot):
+    """
+    Run the worker against a local fake Discord: log in and run setup_hook
+    as usual, then feed synthetic button clicks through the gateway parser
+    and the registered views, and report how many were answered and how fast.
+    """
+    import fake_discord  # test code, not shipped in the image
+
+    shards = len(bot.shard_ids) if bot.shard_ids else 1
+    rate = FAKE_EVENT_RATE * shards
+    api = fake_discord.FakeDiscordAPI()
+    discord.http.Route.BASE = await api.start()
+    try:
+        async with bot:
+            await bot.login("fake-token")  # runs setup_hook
+            print(f"🧪 Fake gateway for {bot.label}: {rate:.0f} clicks/s for {FAKE_GATEWAY_SECONDS:.0f}s", flush=True)
+            start = time.monotonic()
+            sent = await fake_discord.feed_clicks(bot, rate, FAKE_GATEWAY_SECONDS, bot.cluster_id)
+            # Give clicks still in flight the same 3s Discord would
+            settle_deadline = time.monotonic() + 3
+            while not api.responded.issuperset(sent) and time.monotonic() < settle_deadline:
+                await asyncio.sleep(0.05)
+            elapsed = time.monotonic() - start
+            await asyncio.gather(drain_game_tasks(SHUTDOWN_GRACE), drain_user_steps(SHUTDOWN_GRACE))
+            await fake_discord.delete_fake_players(bot.cluster_id)
+    finally:
+        await api.stop()
+
+    answered = len(api.responded.intersection(sent))
+    q = metrics.interaction_first_response.quantile
+    print(
+        f"🧪 {bot.label}: {len(sent)} clicks, {answered} answered ({answered / elapsed:.1f}/s), "
+        f"{len(sent) - answered} unanswered | first response p50 {q(0.5, 'home') * 1000:.0f}ms "
+        f"p99 {q(0.99, 'home') * 1000:.0f}ms",
+        flush=True
+    )
+    print("🧪 API calls: " + ", ".join(f"{route} {n}" for route, n in sorted(api.calls.items())), flush=True)
+
+def run_worker(cluster_id: int = 0, shard_ids: list[int] = None, shard_count: int = None):
+    bot = CasinoBot(cluster_id=cluster_id, shard_ids=shard_ids, shard_count=shard_count)
+    if FAKE_GATEWAY:
+        asyncio.run(run_fake_gateway(bot))
+        return
+
+    token = os.getenv("CASINO_TOKEN")
+    if not token:
+        raise RuntimeError("CASINO_TOKEN is not set in environment variables.")
+    bot.run(token)
+
+def shard_ranges(shard_count: int, clusters: int) -> list[list[int]]:
+    """Split shards 0..shard_count-1 into `clusters` contiguous ranges."""
+    per_cluster, extra = divmod(shard_count, clusters)
+    ranges, start = [], 0
+    for cluster_id in range(clusters):
+        size = per_cluster + (1 if cluster_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+def run_cluster(clusters: int, shard_count: int):
+    """Supervisor: one worker process per cluster, restarted if it crashes."""
+    if shard_count < clusters:
+        raise RuntimeError("CASINO_SHARD_COUNT must be at least CASINO_CLUSTERS.")
+    # Several processes serve the same users, so locks/cooldowns must be shared
+    os.environ["CASINO_COORDINATION"] = "postgres"
+
+    ctx = multiprocessing.get_context("spawn")
+    ranges = shard_ranges(shard_count, clusters)
+    workers = {}
+    stopping = False
+
+    def start(cluster_id):
+        proc = ctx.Process(
+            target=run_worker, args=(cluster_id, ranges[cluster_id], shard_count),
+            name=f"casino-cluster-{cluster_id}"
+        )
+        proc.start()
+        workers[cluster_id] = proc
+        print(f"🟢 Started cluster {cluster_id} (pid {proc.pid}, shards {ranges[cluster_id]})", flush=True)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for proc in workers.values():
+            if proc.is_alive():
+                proc.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for cluster_id in range(clusters):
+        start(cluster_id)
+
+    restarts = dict.fromkeys(workers, 0)
+    while workers:
+        for cluster_id, proc in list(workers.items()):
+            proc.join(timeout=1)
+            if proc.is_alive():
+                continue
+            del workers[cluster_id]
+            if stopping or proc.exitcode == 0:
+                continue
+            restarts[cluster_id] += 1
+            delay = min(2 ** restarts[cluster_id], 60)
+            print(f"🔴 Cluster {cluster_id} exited with {proc.exitcode}; restarting in {delay}s", flush=True)
+            time.sleep(delay)
+            if not stopping:
+                start(cluster_id)
+
+if __name__ == "__main__":
+    if CLUSTER_COUNT > 1:
+        run_cluster(CLUSTER_COUNT, SHARD_COUNT or CLUSTER_COUNT)
+    else:
+        run_worker(0, None, SHARD_COUNT)
@@ -0,0 +1,266 @@
+import contextvars
+import functools
+import logging
+import os
+import time
+from bisect import bisect_left
+
+import discord
+from aiohttp import web
+
+# --- Metrics ---
+# In-process counters and histograms, exposed in Prometheus text format on
+# METRICS_HOST:METRICS_PORT (+ cluster id in sharded mode) and summarized by
+# the admin console. Recording is a dict lookup and a bisect, cheap enough for
+# every query and edit.
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 disables the endpoint
+
+# Game the current task is working for; set by InstrumentedView and copied
+# into tasks it creates, so edits and rate limits are attributed to it
+current_game = contextvars.ContextVar("current_game", default="other")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label: str = None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.values = {}  # label value (or None) -> count
+
+    def inc(self, label_value: str = None, amount: float = 1):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for value, count in sorted(self.values.items(), key=lambda kv: str(kv[0])):
+            lines.append(f"{self.name}{_labels(self.label, value)} {count}")
+        return lines
+
+class _Series:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label: str = None, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self.series = {}  # label value (or None) -> _Series
+
+    def observe(self, value: float, label_value: str = None):
+        series = self.series.get(label_value)
+        if series is None:
+            series = self.series[label_value] = _Series(len(self.buckets))
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def quantile(self, q: float, label_value: str = None) -> float | None:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        series = self.series.get(label_value)
+        if series is None or series.count == 0:
+            return None
+        rank = q * series.count
+        seen = 0
+        for i, n in enumerate(series.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i > 0 else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for value, series in sorted(self.series.items(), key=lambda kv: str(kv[0])):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label, value, le=le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label, value)} {series.sum}")
+            lines.append(f"{self.name}_count{_labels(self.label, value)} {series.count}")
+        return lines
+
+def _labels(label: str | None, value, **extra) -> str:
+    pairs = []
+    if label is not None:
+        pairs.append((label, value))
+    pairs += extra.items()
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+# Gauges are read when scraped: name -> (help, callback returning a number)
+_gauges = {}
+
+def register_gauge(name: str, help_text: str, callback):
+    _gauges[name] = (help_text, callback)
+
+interaction_first_response = Histogram(
+    "casino_interaction_first_response_seconds",
+    "Time from receiving a component interaction to its first response", "game"
+)
+db_query_seconds = Histogram(
+    "casino_db_query_seconds", "Time a database operation held its connection", "query"
+)
+db_pool_wait_seconds = Histogram(
+    "casino_db_pool_wait_seconds", "Time spent waiting for a pool connection"
+)
+discord_edits = Counter("casino_discord_edits_total", "Message edits sent to Discord", "game")
+discord_rate_limits = Counter("casino_discord_rate_limits_total", "HTTP 429 responses from Discord", "game")
+game_task_failures = Counter("casino_game_task_failures_total", "Background game tasks that raised", "game")
+game_tasks_rejected = Counter("casino_game_tasks_rejected_total", "Background game tasks refused at the limit", "game")
+
+HISTOGRAMS = (interaction_first_response, db_query_seconds, db_pool_wait_seconds)
+COUNTERS = (discord_edits, discord_rate_limits, game_task_failures, game_tasks_rejected)
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in HISTOGRAMS + COUNTERS:
+        lines += metric.render()
+    for name, (help_text, callback) in sorted(_gauges.items()):
+        try:
+            value = callback()
+        except Exception:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+# --- Discord helpers ---
+
+async def counted_edit(edit_coro):
+    """Await a message edit, counting it for the current game."""
+    discord_edits.inc(current_game.get())
+    return await edit_coro
+
+# discord.py retries 429s itself and only logs them. These are the templates
+# (record.msg, before formatting) of the lines it logs once per 429, by logger.
+_RATE_LIMIT_MESSAGES = {
+    "discord.http": "We are being rate limited.",  # bot API: channel messages, commands
+    "discord.webhook.async_": "Webhook ID %s is rate limited.",  # interaction responses, edits, followups
+}
+
+class _RateLimitHandler(logging.Handler):
+    """Count the rate-limit warnings discord.py logs."""
+    def emit(self, record: logging.LogRecord):
+        prefix = _RATE_LIMIT_MESSAGES.get(record.name)
+        if prefix is not None and isinstance(record.msg, str) and record.msg.startswith(prefix):
+            discord_rate_limits.inc(current_game.get())
+
+def install_rate_limit_handler():
+    handler = _RateLimitHandler(level=logging.WARNING)
+    for name in _RATE_LIMIT_MESSAGES:
+        logger = logging.getLogger(name)
+        if not any(isinstance(h, _RateLimitHandler) for h in logger.handlers):
+            logger.addHandler(handler)
+
+# The response an InstrumentedView callback owes: [response, game, started].
+# A list so a response sent from a task the callback started still counts.
+_pending_response = contextvars.ContextVar("pending_response", default=None)
+
+def _record_first_response(response):
+    pending = _pending_response.get()
+    if pending is not None and pending[0] is response:
+        pending[0] = None
+        interaction_first_response.observe(time.perf_counter() - pending[2], pending[1])
+
+def instrument_response(cls):
+    """Time the first response an InstrumentedView callback sends through `cls`."""
+    for name in ("defer", "send_message", "edit_message", "send_modal"):
+        method = getattr(cls, name, None)
+        if method is None or getattr(method, "_times_first_response", False):
+            continue
+
+        def wrap(method):
+            @functools.wraps(method)
+            async def timed(self, *args, **kwargs):
+                result = await method(self, *args, **kwargs)
+                _record_first_response(self)
+                return result
+            timed._times_first_response = True
+            return timed
+
+        setattr(cls, name, wrap(method))
+    return cls
+
+instrument_response(discord.InteractionResponse)
+
+class InstrumentedView(discord.ui.View):
+    """View that tags its callbacks with `game` and times their first response."""
+    game = "other"
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        # Runs in the callback's task, so both stick for the whole callback
+        current_game.set(self.game)
+        _pending_response.set([interaction.response, self.game, time.perf_counter()])
+        return True
+
+# --- HTTP endpoint ---
+
+async def _handle_metrics(request):
+    return web.Response(text=render_prometheus(), content_type="text/plain", charset="utf-8")
+
+_runner = None
+
+async def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST):
+    global _runner
+    if _runner is not None or port <= 0:
+        return
+    app = web.Application()
+    app.router.add_get("/metrics", _handle_metrics)
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+    print(f"📊 Metrics on http://{host}:{port}/metrics", flush=True)
+
+async def stop_metrics_server():
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
+
+# --- Admin summary ---
+
+def _ms(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f}ms"
+
+def summary_embed() -> discord.Embed:
+    embed = discord.Embed(title="📊 Metrics", color=discord.Color.dark_teal())
+    for histogram, title in (
+        (interaction_first_response, "First response"),
+        (db_query_seconds, "DB queries"),
+        (db_pool_wait_seconds, "Pool wait"),
+    ):
+        lines = [
+            f"{value or 'all'}: p50 {_ms(histogram.quantile(0.5, value))} | "
+            f"p99 {_ms(histogram.quantile(0.99, value))} | n={series.count}"
+            for value, series in sorted(histogram.series.items(), key=lambda kv: str(kv[0]))
+        ]
+        embed.add_field(name=title, value="\n".join(lines)[:1024] or "No data yet", inline=False)
+
+    games = sorted(set(discord_edits.values) | set(discord_rate_limits.values), key=str)
+    lines = [
+        f"{game}: {discord_edits.values.get(game, 0):.0f} edits, {discord_rate_limits.values.get(game, 0):.0f} × 429"
+        for game in games
+    ]
+    embed.add_field(name="Discord edits", value="\n".join(lines) or "No data yet", inline=False)
+
+    gauges = []
+    for name, (_, callback) in sorted(_gauges.items()):
+        try:
+            gauges.append(f"{name.removeprefix('casino_')}: {callback():g}")
+        except Exception:
+            continue
+    if gauges:
+        embed.add_field(name="Now", value="\n".join(gauges)[:1024], inline=False)
+    return embed
@@ -0,0 +1,167 @@
+"""
+Schema migrations.
+
+Migrations are the numbered .sql files in migrations/ (0001_name.sql, ...),
+applied in order and recorded in schema_version. Startup only reads the
+current version; pending files are applied by whichever process gets the
+advisory lock first. A file whose first line is "-- migrate: no-transaction"
+runs statement by statement outside a transaction (needed for
+CREATE INDEX CONCURRENTLY); every other file runs in one transaction.
+An interrupted concurrent build leaves an INVALID index behind, which
+IF NOT EXISTS would then skip, so one is dropped before it's rebuilt.
+
+    python migrate.py            # apply pending migrations
+    python migrate.py --status   # show applied / pending versions
+"""
+import argparse
+import asyncio
+import re
+from pathlib import Path
+
+import asyncpg
+
+from db_config import build_dsn
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+MIGRATION_LOCK_KEY = 0x636173696E6F  # "casino"
+NO_TRANSACTION_MARKER = "-- migrate: no-transaction"
+LOCK_POLL_INTERVAL = 0.5  # seconds
+
+_FILE_NAME = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+_CONCURRENT_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+([\w.]+)",
+    re.IGNORECASE,
+)
+
+class Migration:
+    __slots__ = ("version", "name", "sql", "transactional")
+
+    def __init__(self, version: int, name: str, sql: str):
+        self.version = version
+        self.name = name
+        self.sql = sql
+        self.transactional = not sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    def statements(self) -> list[str]:
+        """Split a no-transaction file into statements (one per `;` at end of line)."""
+        statements, current = [], []
+        for line in self.sql.splitlines():
+            current.append(line)
+            if line.rstrip().endswith(";"):
+                statement = "\n".join(current).strip()
+                if any(l.strip() and not l.strip().startswith("--") for l in current):
+                    statements.append(statement)
+                current = []
+        return statements
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILE_NAME.match(path.name)
+        if match is None:
+            raise RuntimeError(f"Bad migration file name: {path.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), path.read_text()))
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError("Duplicate migration versions in " + str(directory))
+    return sorted(migrations, key=lambda m: m.version)
+
+async def current_version(conn) -> int:
+    try:
+        return await conn.fetchval("SELECT COALESCE(max(version), 0) FROM schema_version")
+    except asyncpg.UndefinedTableError:
+        return 0
+
+async def _drop_invalid_index(conn, statement: str):
+    """Before CREATE INDEX CONCURRENTLY IF NOT EXISTS, drop the index if an interrupted build left it INVALID."""
+    match = _CONCURRENT_INDEX.search("\n".join(
+        line for line in statement.splitlines() if not line.strip().startswith("--")
+    ))
+    if match is None:
+        return
+    index = match.group(1)
+    valid = await conn.fetchval(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", index
+    )
+    if valid is False:
+        print(f"🛠️ Dropping INVALID index {index} left by an interrupted build", flush=True)
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index}")
+
+async def _apply(conn, migration: Migration):
+    if migration.transactional:
+        async with conn.transaction():
+            await conn.execute(migration.sql)
+            await conn.execute(
+                "INSERT INTO schema_version (version, name) VALUES ($1, $2)",
+                migration.version, migration.name
+            )
+        return
+
+    for statement in migration.statements():
+        await _drop_invalid_index(conn, statement)
+        await conn.execute(statement)
+    await conn.execute(
+        "INSERT INTO schema_version (version, name) VALUES ($1, $2)",
+        migration.version, migration.name
+    )
+
+async def migrate(pool, migrations: list[Migration] = None) -> list[int]:
+    """Apply pending migrations and return their versions (empty when up to date)."""
+    migrations = load_migrations() if migrations is None else migrations
+    if not migrations:
+        return []
+    latest = migrations[-1].version
+
+    async with pool.acquire() as conn:
+        # Fast path on every start and reconnect: one indexed read
+        if await current_version(conn) >= latest:
+            return []
+
+        # Session-level lock, since no-transaction migrations can't hold an xact lock.
+        # Polled rather than blocking: CREATE INDEX CONCURRENTLY waits for every
+        # open transaction, including a pg_advisory_lock() call stuck behind it.
+        while not await conn.fetchval("SELECT pg_try_advisory_lock($1)", MIGRATION_LOCK_KEY):
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+        try:
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """)
+            # Another process may have applied some while we waited for the lock
+            version = await current_version(conn)
+            applied = []
+            for migration in migrations:
+                if migration.version <= version:
+                    continue
+                print(f"🛠️ Applying migration {migration.version:04d}_{migration.name}", flush=True)
+                await _apply(conn, migration)
+                applied.append(migration.version)
+            return applied
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+
+async def _main():
+    parser = argparse.ArgumentParser(description="Apply casino schema migrations")
+    parser.add_argument("--status", action="store_true", help="only show applied / pending versions")
+    args = parser.parse_args()
+
+    pool = await asyncpg.create_pool(dsn=build_dsn(), min_size=1, max_size=1)
+    try:
+        migrations = load_migrations()
+        if args.status:
+            async with pool.acquire() as conn:
+                version = await current_version(conn)
+            for m in migrations:
+                state = "applied" if m.version <= version else "pending"
+                print(f"{m.version:04d}_{m.name}: {state}")
+            return
+        applied = await migrate(pool, migrations)
+        print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,26 @@
+-- Accounts table, plus the fixes older deployments picked up over time
+CREATE TABLE IF NOT EXISTS user_accounts (
+    user_id BIGINT PRIMARY KEY,
+    username TEXT DEFAULT '',
+    balance INTEGER DEFAULT 30000 CHECK (balance >= 0),
+    total_bet INTEGER DEFAULT 0,
+    last_daily_claim BIGINT DEFAULT 0,
+    wheel_state SMALLINT DEFAULT 0
+);
+
+ALTER TABLE user_accounts ADD COLUMN IF NOT EXISTS wheel_state SMALLINT DEFAULT 0;
+
+-- Make sure balance isn't already negative from old data
+UPDATE user_accounts SET balance = 0 WHERE balance < 0;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'balance_non_negative'
+    ) THEN
+        ALTER TABLE user_accounts
+        ADD CONSTRAINT balance_non_negative CHECK (balance >= 0);
+    END IF;
+END
+$$;
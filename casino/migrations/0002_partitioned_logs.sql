@@ -0,0 +1,68 @@
+-- logs range-partitioned by month on created_at (see log_maintenance.py).
+-- An old unpartitioned logs table is converted in place.
+DO $$
+DECLARE
+    kind "char";
+    first_month DATE := date_trunc('month', now())::date;
+    month DATE;
+BEGIN
+    SELECT relkind INTO kind FROM pg_class WHERE oid = to_regclass('logs');
+
+    IF kind = 'r' THEN
+        ALTER TABLE logs RENAME TO logs_legacy;
+        SELECT LEAST(first_month, date_trunc('month', min(created_at))::date)
+        INTO first_month FROM logs_legacy;
+    END IF;
+
+    IF kind IS NULL OR kind = 'r' THEN
+        CREATE TABLE logs (
+            id BIGSERIAL,
+            user_id BIGINT NOT NULL,
+            username TEXT DEFAULT '',
+            source TEXT DEFAULT '',
+            action TEXT NOT NULL,
+            bet_amount INTEGER DEFAULT 0,
+            delta INTEGER NOT NULL,
+            balance_after INTEGER NOT NULL,
+            total_bet_after INTEGER DEFAULT 0,
+            metadata JSONB DEFAULT '{}',
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at);
+        -- Defined on the parent, so every partition gets them automatically
+        CREATE INDEX logs_user_created_idx ON logs (user_id, created_at);
+        CREATE INDEX logs_source_created_idx ON logs (source, created_at);
+    END IF;
+
+    -- Partitions up to 3 months ahead; the maintenance job keeps extending them
+    month := first_month;
+    WHILE month <= (date_trunc('month', now()) + interval '3 months')::date LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF logs FOR VALUES FROM (%L) TO (%L)',
+            'logs_p' || to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+
+    IF kind = 'r' THEN
+        INSERT INTO logs (id, user_id, username, source, action, bet_amount, delta,
+                          balance_after, total_bet_after, metadata, created_at)
+        SELECT id, user_id, username, source, action, bet_amount, delta,
+               balance_after, total_bet_after, metadata, COALESCE(created_at, now())
+        FROM logs_legacy;
+        PERFORM setval(pg_get_serial_sequence('logs', 'id'), GREATEST((SELECT max(id) FROM logs), 1));
+        DROP TABLE logs_legacy;
+    END IF;
+END
+$$;
+
+-- Rolled-up partitions dropped by the retention job
+CREATE TABLE IF NOT EXISTS logs_monthly_summary (
+    month DATE NOT NULL,
+    user_id BIGINT NOT NULL,
+    source TEXT NOT NULL,
+    rounds BIGINT NOT NULL,
+    bets BIGINT NOT NULL,
+    net_delta BIGINT NOT NULL,
+    PRIMARY KEY (month, user_id, source)
+);
@@ -0,0 +1,15 @@
+-- Cross-process cooldowns and active game sessions (coordination.py).
+-- UNLOGGED: losing them in a crash only resets cooldowns.
+CREATE UNLOGGED TABLE IF NOT EXISTS casino_cooldowns (
+    user_id BIGINT NOT NULL,
+    kind TEXT NOT NULL,
+    last_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, kind)
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS casino_sessions (
+    kind TEXT NOT NULL,
+    user_id BIGINT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (kind, user_id)
+);
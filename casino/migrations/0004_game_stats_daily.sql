@@ -0,0 +1,22 @@
+-- Per user/game/day rollup kept up to date by settle_game, backfilled from logs
+CREATE TABLE IF NOT EXISTS game_stats_daily (
+    user_id BIGINT NOT NULL,
+    source TEXT NOT NULL,
+    day DATE NOT NULL,
+    rounds INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    bets BIGINT NOT NULL DEFAULT 0,
+    net_delta BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, source, day)
+);
+
+CREATE INDEX IF NOT EXISTS game_stats_daily_day_idx ON game_stats_daily (day, source);
+
+-- Deployments that already had the table keep their rows
+INSERT INTO game_stats_daily (user_id, source, day, rounds, wins, bets, net_delta)
+SELECT user_id, source, created_at::date, count(*), count(*) FILTER (WHERE delta > 0),
+       COALESCE(sum(bet_amount), 0), sum(delta)
+FROM logs
+WHERE source IN ('slots', 'blackjack', 'wheel_of_fortune')
+GROUP BY user_id, source, created_at::date
+ON CONFLICT (user_id, source, day) DO NOTHING;
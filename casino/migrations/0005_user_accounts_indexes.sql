@@ -0,0 +1,16 @@
+-- migrate: no-transaction
+-- Built CONCURRENTLY so a large accounts table stays writable. If a build is
+-- interrupted, migrate.py drops the INVALID index it leaves behind on re-run.
+
+-- Leaderboard / admin ordering (top-N with LIMIT, rank counts and keyset
+-- pages). Scanned backwards it gives ORDER BY balance DESC, user_id DESC, so
+-- (balance, user_id) < (...) is an index range.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_accounts_balance_user_idx
+ON user_accounts (balance, user_id);
+
+-- Superseded by user_accounts_balance_user_idx
+DROP INDEX CONCURRENTLY IF EXISTS user_accounts_balance_idx;
+
+-- Admin username prefix search
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_accounts_username_prefix_idx
+ON user_accounts (lower(username) text_pattern_ops);
@@ -0,0 +1,6 @@
+-- Small key/value store for bot bookkeeping (e.g. the synced command tree hash)
+CREATE TABLE IF NOT EXISTS bot_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
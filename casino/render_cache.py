@@ -0,0 +1,16 @@
+import functools
+
+# --- Embed render cache ---
+# Embed.copy() goes through to_dict()/from_dict(), so a cached embed is only
+# cheaper than building it again when the build does real work (e.g. many
+# fields). Small embeds are built directly; cache their text instead.
+
+def static_embed(builder):
+    """Build the embed once at import time; every call returns a fresh copy."""
+    template = builder()
+
+    @functools.wraps(builder)
+    def clone():
+        return template.copy()
+
+    return clone
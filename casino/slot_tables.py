@@ -0,0 +1,23 @@
+# Slot machine tables and payout rules. Kept free of Discord/database imports
+# so offline tools (slots_sim.py) can use exactly what the bot plays with.
+
+SLOT_SYMBOLS = (
+    ["🍒"] * 39 + ["🍋"] * 28 + ["🍉"] * 15 +
+    ["🍇"] * 10 + ["🔔"] * 5 + ["🍀"] * 3
+)
+SYMBOL_COEFFICIENTS = {
+    "🍒": 2, "🍋": 3, "🍉": 4,
+    "🍇": 5, "🔔": 7, "🍀": 10
+}
+# Extra multiplier for a win at a given bet (anything else is x1)
+BET_BONUS = {100: 1.5, 500: 2, 1000: 4}
+BET_TIERS = (50, 100, 500, 1000)
+
+def spin_payout(reels, bet):
+    """Return (result, win, net_change, bonus) for a finished spin."""
+    result = (reels[0] == reels[1] == reels[2])
+    if not result:
+        return result, 0, -bet, 1
+    bonus = BET_BONUS.get(bet, 1)
+    win = int(bet * SYMBOL_COEFFICIENTS[reels[0]] * bonus)
+    return result, win, win - bet, bonus
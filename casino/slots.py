@@ -1,90 +1,70 @@
 import discord
 import random
-import asyncio
-from database import get_balance, update_balance_atomic, can_act
-from my_logginng import db_log
-
-SLOT_SYMBOLS = (
-    ["🍒"] * 39 + ["🍋"] * 28 + ["🍉"] * 15 +
-    ["🍇"] * 10 + ["🔔"] * 5 + ["🍀"] * 3
-)
-SYMBOL_COEFFICIENTS = {
-    "🍒": 2, "🍋": 3, "🍉": 4,
-    "🍇": 5, "🔔": 7, "🍀": 10
-}
+from database import get_balance, settle_game
+from user_executor import submit
+from coordination import get_coordinator
+from animation import play, schedule_from_delays
+from render_cache import static_embed
+from slot_tables import SLOT_SYMBOLS, SYMBOL_COEFFICIENTS, spin_payout
+from metrics import InstrumentedView, counted_edit
+from task_supervisor import spawn, has_capacity
 
 async def slot_machine_run(msg, bet, uid, username):
-    reels = ["❓"] * 3
-    embed = discord.Embed(title="🎰 Rolling...", description=" | ".join(reels), color=discord.Color.gold())
-    bonus = 1
-    await msg.edit(embed=embed)
-
-    for i in range(3):
-        await asyncio.sleep(random.uniform(0.4, 0.9))
-        reels[i] = random.choice(SLOT_SYMBOLS)
-        embed.description = " | ".join(reels)
-        await msg.edit(embed=embed)
-
-    result = (reels[0] == reels[1] == reels[2])
-    bal, _ = await get_balance(uid, username)
-    if bet and bal < bet:
-        embed.color = discord.Color.red()
-        embed.add_field(name="❌ Error", value=f"Not enough coins! You have {bal}.")
-    else:
-        if result:
-            m = SYMBOL_COEFFICIENTS[reels[0]]
-            if bet == 1000:
-                bonus = 4
-            elif bet == 500:
-                bonus = 2
-            elif bet == 100:
-                bonus = 1.5
-            win = int(bet * m * bonus)
-            net_change = win - bet  # net gain
-        else:
-            win = 0
-            net_change = -bet  # net loss
-    
-        # Atomically update balance, ensuring no overdraft
-        success = await update_balance_atomic(uid, net_change, bet)
-        if not success:
-            # The balance check above might be stale due to concurrent spins
-            embed.color = discord.Color.red()
-            embed.add_field(name="❌ Error", value="Balance changed during spin, insufficient funds.")
-        else:
-            if win > 0 or (result and win==bet==0):
+    reels = [random.choice(SLOT_SYMBOLS) for _ in range(3)]
+    result, win, net_change, bonus = spin_payout(reels, bet)
+
+    # Atomically update balance (no overdraft), log the spin and read back the new balance
+    settled, bal, _ = await submit(
+        uid, settle_game, uid, username, "slots", "spin", net_change, bet,
+        metadata={"result": result, "symbols": reels, "multiplier": SYMBOL_COEFFICIENTS.get(reels[0], 1) if result else 0, "bonus": bonus}
+    )
+
+    embed = discord.Embed(title="🎰 Rolling...", color=discord.Color.gold())
+
+    # Frame i reveals reel i; the last frame also carries the outcome
+    async def show_frame(i):
+        embed.description = " | ".join(reels[:i + 1] + ["❓"] * (2 - i))
+        if i == 2:
+            if not settled:
+                embed.color = discord.Color.red()
+                embed.add_field(name="❌ Error", value=f"Not enough coins! You have {bal}.")
+            elif win > 0 or (result and win==bet==0):
                 embed.color = discord.Color.green()
                 embed.add_field(name="🎉 Win", value=f"You won {win} coins!")
             else:
                 embed.color = discord.Color.red()
                 embed.add_field(name="😢 Loss", value=f"You lost {bet} coins.")
+            embed.set_footer(text=f"Balance: {bal}")
+        await counted_edit(msg.edit(embed=embed))
 
-    # Fetch updated balance to show in footer
-    bal, total_bet = await get_balance(uid, username)
-    embed.set_footer(text=f"Balance: {bal}")
-    # log the final result
-    await db_log(
-        user_id=uid,
-        username=username,
-        source="slots",
-        action="spin",
-        bet_amount=bet,
-        delta=net_change,
-        balance_after=bal,
-        total_bet_after=total_bet,
-        metadata={"result": result, "symbols": reels, "multiplier": SYMBOL_COEFFICIENTS.get(reels[0], 1) if result else 0, "bonus": bonus}
-    )
+    await play(show_frame, schedule_from_delays(random.uniform(0.4, 0.9) for _ in range(3)))
+
+@static_embed
+def coefficients_embed():
+    embed = discord.Embed(title="🎰 Coefficients", color=discord.Color.purple())
+    for e, c in SYMBOL_COEFFICIENTS.items():
+        chance = SLOT_SYMBOLS.count(e) / len(SLOT_SYMBOLS)
+        embed.add_field(name=e, value=f"{c}× • {chance:.1%}", inline=True)
+    embed.add_field(name="Additional Coefficients by Bet",
+                    value="• 50 - x1\n• 100 - x1.5\n• 500 - x2\n• 1000 - x4",
+                    inline=False)
+    return embed
 
-    await msg.edit(embed=embed)
+BUSY_MESSAGE = "🎰 All slot machines are busy right now, try again in a moment!"
 
 # SlotView UI class with buttons
-class SlotView(discord.ui.View):
+class SlotView(InstrumentedView):
+    game = "slots"
+
     def __init__(self, msg=None):
         super().__init__(timeout=60)
         self.msg = msg  # store original ephemeral message
 
     async def common(self, interaction, bet):
-        if not can_act(interaction.user.id, 0.5):
+        if not has_capacity("slots"):
+            await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+            return
+        if not await get_coordinator().try_cooldown(interaction.user.id, "slots", 0.5):
             await interaction.response.send_message(
                 "⏱️ Cooldown: wait a few seconds before spinning again!", ephemeral=True
             )
@@ -99,19 +79,22 @@ class SlotView(discord.ui.View):
                 description=" | ".join(["❓"] * 3),
                 color=discord.Color.gold()
             )
-            await self.msg.edit(content=None, embed=embed, view=None)
+            await counted_edit(self.msg.edit(content=None, embed=embed, view=None))
 
-            # Run animation asynchronously
-            asyncio.create_task(
-                slot_machine_run(self.msg, bet, interaction.user.id, interaction.user.name)
+            # Settle and animate in the background; critical, so shutdown waits for the settlement
+            task = spawn(
+                "slots", slot_machine_run(self.msg, bet, interaction.user.id, interaction.user.name), critical=True
             )
+            if task is None:
+                # Filled up (or started shutting down) since the check above; nothing was charged
+                await counted_edit(self.msg.edit(content=BUSY_MESSAGE, embed=None))
 
         # Spawn new ephemeral message and get its message object
         new_msg = await interaction.followup.send(
             "🎰 Ready for another spin?", view=SlotView(), ephemeral=True, wait=True
         )
         new_buttons = SlotView(new_msg)
-        await new_msg.edit(view=new_buttons)
+        await counted_edit(new_msg.edit(view=new_buttons))
 
     @discord.ui.button(label="Spin (Free)", style=discord.ButtonStyle.secondary, custom_id="slot_spin")
     async def spin(self, interaction, button: discord.ui.Button): await self.common(interaction, 0)
@@ -131,11 +114,4 @@ class SlotView(discord.ui.View):
 
     @discord.ui.button(label="Show Coefficients", style=discord.ButtonStyle.secondary, custom_id="show_coeffs")
     async def coeffs(self, interaction, button: discord.ui.Button):
-        embed = discord.Embed(title="🎰 Coefficients", color=discord.Color.purple())
-        for e, c in SYMBOL_COEFFICIENTS.items():
-            chance = SLOT_SYMBOLS.count(e) / len(SLOT_SYMBOLS)
-            embed.add_field(name=e, value=f"{c}× • {chance:.1%}", inline=True)
-        embed.add_field(name="Additional Coefficients by Bet",
-                        value="• 50 - x1\n• 100 - x1.5\n• 500 - x2\n• 1000 - x4",
-                        inline=False)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=coefficients_embed(), ephemeral=True)
@@ -0,0 +1,153 @@
+"""
+Slot machine RTP calculator and simulator.
+
+Uses the live tables from slot_tables.py, so a payout change can be checked
+offline before it is deployed:
+
+    python slots_sim.py                      # exact RTP + 20M simulated spins per tier
+    python slots_sim.py --spins 50000000 --seed 7 --tiers 100 1000
+
+Needs numpy (docker_conf/casino-dev-requirements.txt); the bot itself does not.
+"""
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from slot_tables import SLOT_SYMBOLS, SYMBOL_COEFFICIENTS, BET_TIERS, spin_payout
+
+CHUNK_SPINS = 4_000_000
+
+# Reel entry -> symbol id, so equal symbols compare equal regardless of entry
+_SYMBOL_IDS = {symbol: i for i, symbol in enumerate(SYMBOL_COEFFICIENTS)}
+_SYMBOL_INDEX = np.array([_SYMBOL_IDS[s] for s in SLOT_SYMBOLS], dtype=np.uint8)
+
+def symbol_odds() -> dict:
+    """Probability of each symbol on a single reel."""
+    counts = Counter(SLOT_SYMBOLS)
+    return {symbol: counts[symbol] / len(SLOT_SYMBOLS) for symbol in SYMBOL_COEFFICIENTS}
+
+def exact_stats(bet: int) -> dict:
+    """Exact per-spin statistics for a bet tier, from the reel odds."""
+    odds = symbol_odds()
+    hit_rate = 0.0
+    mean = 0.0
+    second_moment = 0.0
+    for symbol, p in odds.items():
+        p_line = p ** 3
+        _, _, net, _ = spin_payout([symbol] * 3, bet)
+        hit_rate += p_line
+        mean += p_line * net
+        second_moment += p_line * net * net
+    lose = 1 - hit_rate
+    mean += lose * -bet
+    second_moment += lose * bet * bet
+    return {
+        "bet": bet,
+        "hit_rate": hit_rate,
+        "rtp": (mean + bet) / bet,
+        "edge": -mean / bet,
+        "mean_net": mean,
+        "std_net": (second_moment - mean * mean) ** 0.5,
+    }
+
+def _net_table(bet: int) -> np.ndarray:
+    """Net result of a winning line per reel-entry index (losses handled separately)."""
+    return np.array([spin_payout([s] * 3, bet)[2] for s in SLOT_SYMBOLS], dtype=np.int64)
+
+def _spin_nets(rng, n: int, net_table: np.ndarray, bet: int) -> np.ndarray:
+    # Each reel picks one of the 100 entries of SLOT_SYMBOLS uniformly, like random.choice
+    reels = rng.integers(0, len(SLOT_SYMBOLS), size=(3, n), dtype=np.uint8)
+    symbols = _SYMBOL_INDEX[reels]
+    hit = (symbols[0] == symbols[1]) & (symbols[1] == symbols[2])
+    return np.where(hit, net_table[reels[0]], -bet)
+
+def simulate_spins(bet: int, spins: int, rng) -> dict:
+    """Monte Carlo estimate of mean/variance of the net result per spin."""
+    net_table = _net_table(bet)
+    total = 0
+    total_sq = 0
+    hits = 0
+    done = 0
+    while done < spins:
+        n = min(CHUNK_SPINS, spins - done)
+        nets = _spin_nets(rng, n, net_table, bet)
+        total += int(nets.sum())
+        total_sq += int(np.square(nets).sum())
+        hits += int((nets != -bet).sum())
+        done += n
+    mean = total / spins
+    return {
+        "bet": bet,
+        "spins": spins,
+        "hit_rate": hits / spins,
+        "rtp": (mean + bet) / bet,
+        "mean_net": mean,
+        "std_net": max(total_sq / spins - mean * mean, 0) ** 0.5,
+    }
+
+def simulate_sessions(bet: int, sessions: int, session_spins: int, rng) -> dict:
+    """Distribution of session results and worst drawdowns for players doing `session_spins` spins."""
+    net_table = _net_table(bet)
+    finals = []
+    drawdowns = []
+    rows_per_chunk = max(1, CHUNK_SPINS // session_spins)
+    done = 0
+    while done < sessions:
+        rows = min(rows_per_chunk, sessions - done)
+        nets = _spin_nets(rng, rows * session_spins, net_table, bet).reshape(rows, session_spins)
+        path = np.cumsum(nets, axis=1)
+        peak = np.maximum(np.maximum.accumulate(path, axis=1), 0)
+        drawdowns.append((peak - path).max(axis=1))
+        finals.append(path[:, -1])
+        done += rows
+    finals = np.concatenate(finals)
+    drawdowns = np.concatenate(drawdowns)
+    percentiles = (1, 10, 50, 90, 99)
+    return {
+        "bet": bet,
+        "sessions": sessions,
+        "session_spins": session_spins,
+        "final": dict(zip(percentiles, np.percentile(finals, percentiles))),
+        "drawdown": dict(zip(percentiles, np.percentile(drawdowns, percentiles))),
+        "p_losing_session": float((finals < 0).mean()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Slot machine RTP per bet tier")
+    parser.add_argument("--tiers", type=int, nargs="+", default=list(BET_TIERS))
+    parser.add_argument("--spins", type=int, default=20_000_000, help="simulated spins per tier (0 to skip)")
+    parser.add_argument("--sessions", type=int, default=20_000, help="simulated player sessions per tier (0 to skip)")
+    parser.add_argument("--session-spins", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    print("Exact")
+    print(f"{'bet':>6} {'hit rate':>9} {'RTP':>8} {'edge':>8} {'std/spin':>10}")
+    for bet in args.tiers:
+        s = exact_stats(bet)
+        print(f"{bet:>6} {s['hit_rate']:>9.4%} {s['rtp']:>8.3%} {s['edge']:>8.3%} {s['std_net']:>10.1f}")
+
+    if args.spins:
+        print(f"\nSimulated ({args.spins:,} spins per tier)")
+        print(f"{'bet':>6} {'hit rate':>9} {'RTP':>8} {'std/spin':>10} {'spins/s':>12}")
+        for bet in args.tiers:
+            start = time.perf_counter()
+            s = simulate_spins(bet, args.spins, rng)
+            rate = args.spins / (time.perf_counter() - start)
+            print(f"{bet:>6} {s['hit_rate']:>9.4%} {s['rtp']:>8.3%} {s['std_net']:>10.1f} {rate:>12,.0f}")
+
+    if args.sessions:
+        print(f"\nSessions ({args.sessions:,} players x {args.session_spins} spins)")
+        print(f"{'bet':>6} {'P(loss)':>8} {'final p1/p50/p99':>26} {'max drawdown p50/p90/p99':>28}")
+        for bet in args.tiers:
+            s = simulate_sessions(bet, args.sessions, args.session_spins, rng)
+            final = "/".join(f"{s['final'][p]:.0f}" for p in (1, 50, 99))
+            drawdown = "/".join(f"{s['drawdown'][p]:.0f}" for p in (50, 90, 99))
+            print(f"{bet:>6} {s['p_losing_session']:>8.2%} {final:>26} {drawdown:>28}")
+
+if __name__ == "__main__":
+    main()
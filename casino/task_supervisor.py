@@ -0,0 +1,102 @@
+import asyncio
+import os
+import traceback
+
+import metrics
+from alerts import notify
+
+# --- Game task supervisor ---
+# Work a game starts in the background (e.g. a slot spin that settles and then
+# animates) goes through spawn(), which keeps a reference to the task, caps
+# how many run at once per game and in total, and reports failures. On
+# shutdown, drain() waits for the critical ones, those that settle balances,
+# before the connection pool goes away.
+
+GAME_TASK_LIMIT = int(os.getenv("GAME_TASK_LIMIT", "1000"))  # all games together
+GAME_TASK_LIMIT_PER_GAME = int(os.getenv("GAME_TASK_LIMIT_PER_GAME", "500"))
+SHUTDOWN_GRACE = float(os.getenv("CASINO_SHUTDOWN_GRACE", "20"))  # seconds drain() waits for critical tasks
+
+_tasks = {}  # game -> set of running tasks
+_critical = set()
+_accepting = True
+
+task_stats = {
+    "started": 0,
+    "failed": 0,
+    "rejected": 0,
+    "cancelled": 0,
+}
+
+def running_tasks(game: str = None) -> int:
+    if game is not None:
+        return len(_tasks.get(game, ()))
+    return sum(len(tasks) for tasks in _tasks.values())
+
+def get_task_stats() -> dict:
+    stats = dict(task_stats)
+    stats["running"] = running_tasks()
+    stats["critical"] = len(_critical)
+    stats["per_game"] = {game: len(tasks) for game, tasks in _tasks.items() if tasks}
+    return stats
+
+metrics.register_gauge("casino_game_tasks_running", "Background game tasks running", running_tasks)
+
+def has_capacity(game: str) -> bool:
+    return _accepting and running_tasks(game) < GAME_TASK_LIMIT_PER_GAME and running_tasks() < GAME_TASK_LIMIT
+
+def spawn(game: str, coro, *, critical: bool = False) -> asyncio.Task | None:
+    """
+    Run `coro` as a tracked background task for `game`. Returns None (and
+    closes the coroutine) when the game or the process is at its limit or
+    shutting down; the caller should tell the user to try again.
+    """
+    if not has_capacity(game):
+        coro.close()
+        task_stats["rejected"] += 1
+        metrics.game_tasks_rejected.inc(game)
+        return None
+    task = asyncio.create_task(coro, name=f"{game}:{getattr(coro, '__qualname__', 'task')}")
+    _tasks.setdefault(game, set()).add(task)
+    if critical:
+        _critical.add(task)
+    task_stats["started"] += 1
+    task.add_done_callback(lambda t: _finished(game, t))
+    return task
+
+def _finished(game: str, task: asyncio.Task):
+    _tasks[game].discard(task)
+    _critical.discard(task)
+    if task.cancelled():
+        task_stats["cancelled"] += 1
+        return
+    error = task.exception()  # also marks it retrieved, so asyncio doesn't report it again
+    if error is None:
+        return
+    task_stats["failed"] += 1
+    metrics.game_task_failures.inc(game)
+    tb = "".join(traceback.format_exception(error))
+    print(f"❌ Game task {task.get_name()} failed:\n{tb}", flush=True)
+    notify(f"Game task {task.get_name()} failed", tb)
+
+async def drain(timeout: float = SHUTDOWN_GRACE) -> bool:
+    """
+    Stop accepting new tasks, wait up to `timeout` seconds for the critical
+    ones and cancel whatever is still running. Returns True if every critical
+    task finished.
+    """
+    global _accepting
+    _accepting = False
+    critical = set(_critical)
+    if critical:
+        print(f"⏳ Waiting up to {timeout:.0f}s for {len(critical)} settling game task(s)", flush=True)
+        _, pending = await asyncio.wait(critical, timeout=timeout)
+    else:
+        pending = set()
+    leftover = [task for tasks in _tasks.values() for task in tasks if not task.done()]
+    for task in leftover:
+        task.cancel()
+    if leftover:
+        await asyncio.gather(*leftover, return_exceptions=True)
+    if pending:
+        print(f"⚠️ {len(pending)} settling game task(s) did not finish in time and were cancelled", flush=True)
+    return not pending
@@ -0,0 +1,73 @@
+import pytest
+
+import database
+from database import AccountCache
+
+def row(balance: int, username: str = "player") -> dict:
+    return {"balance": balance, "total_bet": 0, "wheel_state": 0, "username": username}
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(database.time, "monotonic", lambda: now[0])
+    return now
+
+def test_hit_and_miss(clock):
+    cache = AccountCache(max_size=10, ttl=60)
+    assert cache.get(1) is None
+    cache.put(1, row(500))
+    assert cache.get(1)["balance"] == 500
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = AccountCache(max_size=10, ttl=60)
+    cache.put(1, row(500))
+    clock[0] += 59.9
+    assert cache.get(1) is not None
+    clock[0] += 0.1
+    assert cache.get(1) is None
+    assert cache.evictions == 1
+
+def test_least_recently_used_is_evicted(clock):
+    cache = AccountCache(max_size=2, ttl=60)
+    cache.put(1, row(1))
+    cache.put(2, row(2))
+    cache.get(1)  # 2 is now the oldest
+    cache.put(3, row(3))
+    assert cache.get(2) is None
+    assert cache.get(1)["balance"] == 1
+    assert cache.get(3)["balance"] == 3
+    assert cache.evictions == 1
+
+def test_zero_size_disables_the_cache(clock):
+    cache = AccountCache(max_size=0, ttl=60)
+    cache.put(1, row(500))
+    assert cache.get(1) is None
+
+def test_missing_row_is_not_stored(clock):
+    cache = AccountCache(max_size=10, ttl=60)
+    cache.put(1, None)
+    assert cache.get(1) is None
+
+def test_fill_stores_the_row_read():
+    cache = AccountCache(max_size=10, ttl=60)
+    with cache.fill(1) as fill:
+        fill(row(500))
+    assert cache.get(1)["balance"] == 500
+
+def test_fill_does_not_overwrite_a_newer_write():
+    cache = AccountCache(max_size=10, ttl=60)
+    with cache.fill(1) as fill:
+        cache.put(1, row(700))  # a settle finished while the read was in flight
+        fill(row(500))
+    assert cache.get(1)["balance"] == 700
+
+def test_fill_after_invalidate_is_dropped():
+    cache = AccountCache(max_size=10, ttl=60)
+    with cache.fill(1) as fill:
+        cache.invalidate(1)
+        fill(row(500))
+    assert cache.get(1) is None
+    with cache.fill(1) as fill:  # a later read is unaffected
+        fill(row(600))
+    assert cache.get(1)["balance"] == 600
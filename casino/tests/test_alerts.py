@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+import alerts
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Run the alert sender against a recorder instead of the webhook."""
+    monkeypatch.setattr(alerts, "WEBHOOK_URL", "https://discord.com/api/webhooks/1/test")
+    monkeypatch.setattr(alerts, "alert_stats", dict.fromkeys(alerts.alert_stats, 0))
+    monkeypatch.setattr(alerts, "ALERT_BURST", 2)
+    monkeypatch.setattr(alerts, "ALERT_INTERVAL", 0.2)
+    calls = []
+
+    async def send(alert, suppressed):
+        calls.append((time.monotonic(), alert.title, alert.count - 1 + suppressed))
+
+    monkeypatch.setattr(alerts, "_send", send)
+    return calls
+
+def test_burst_then_rate_limited(sent):
+    async def run():
+        alerts.start_alerts()
+        for i in range(4):
+            assert alerts.notify(f"error {i}", f"traceback {i}")
+        await asyncio.sleep(0.6)
+        await alerts.stop_alerts()
+
+    asyncio.run(run())
+    assert [title for _, title, _ in sent] == ["error 0", "error 1", "error 2", "error 3"]
+    times = [t for t, _, _ in sent]
+    assert times[1] - times[0] < 0.1  # the burst goes out at once
+    assert times[2] - times[1] >= 0.18  # then one per ALERT_INTERVAL
+    assert times[3] - times[2] >= 0.18
+
+def test_repeats_fold_into_the_queued_alert(sent):
+    async def run():
+        alerts.start_alerts()
+        for _ in range(3):
+            alerts.notify("error", "Traceback at 0x7f00aa")
+        alerts.notify("error", "Traceback at 0x7f00bb")  # only the address differs
+        await alerts.stop_alerts()
+
+    asyncio.run(run())
+    assert [(title, repeats) for _, title, repeats in sent] == [("error", 3)]
+    assert alerts.alert_stats["coalesced"] == 3
+
+def test_repeats_after_sending_are_held_back(sent):
+    async def run():
+        alerts.start_alerts()
+        alerts.notify("error", "traceback")
+        await asyncio.sleep(0.05)
+        alerts.notify("error", "traceback")
+        alerts.notify("error", "traceback")
+        held = alerts._recent[alerts.fingerprint("error", "traceback")][1]
+        await alerts.stop_alerts()
+        return held
+
+    assert asyncio.run(run()) == 2
+    assert len(sent) == 1
+    assert alerts.alert_stats["coalesced"] == 2
+
+def test_full_queue_drops_alerts(sent, monkeypatch):
+    monkeypatch.setattr(alerts, "ALERT_QUEUE_SIZE", 2)
+
+    async def run():
+        alerts.start_alerts()
+        results = [alerts.notify(f"error {i}", "traceback") for i in range(3)]
+        await alerts.stop_alerts()
+        return results
+
+    assert asyncio.run(run()) == [True, True, False]
+    assert alerts.alert_stats["dropped"] >= 1
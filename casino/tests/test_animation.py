@@ -0,0 +1,43 @@
+import pytest
+
+from animation import ease_out_schedule, plan_keyframes, schedule_from_delays
+
+def gaps(schedule, keyframes):
+    return [schedule[b] - schedule[a] for a, b in zip(keyframes, keyframes[1:])]
+
+def test_empty_schedule():
+    assert plan_keyframes([], 2) == []
+
+def test_single_frame():
+    assert plan_keyframes([0.5], 2) == [0]
+
+def test_slow_schedule_keeps_every_frame():
+    schedule = schedule_from_delays([1.0] * 5)
+    assert plan_keyframes(schedule, 2) == [0, 1, 2, 3, 4]
+
+def test_fast_schedule_is_thinned_to_the_budget():
+    schedule = schedule_from_delays([0.1] * 30)
+    keyframes = plan_keyframes(schedule, 2)
+    assert keyframes[-1] == 29
+    assert min(gaps(schedule, keyframes)) >= 0.5 - 1e-9
+    assert keyframes == sorted(set(keyframes))
+
+def test_final_frame_keeps_its_gap():
+    # Frame 1 would be 0.5s after frame 0 but only 0.2s before the last one
+    schedule = [0.0, 0.5, 0.7]
+    assert plan_keyframes(schedule, 2) == [0, 2]
+
+def test_no_limit_keeps_every_frame():
+    schedule = schedule_from_delays([0.01] * 10)
+    assert plan_keyframes(schedule, 0) == list(range(10))
+
+@pytest.mark.parametrize("frames", [2, 25, 60])
+def test_ease_out_schedule(frames):
+    schedule = ease_out_schedule(frames, 10)
+    assert len(schedule) == frames
+    assert schedule[-1] == pytest.approx(10)
+    delays = [b - a for a, b in zip(schedule, schedule[1:])]
+    assert delays == sorted(delays)  # slows down towards the end
+    keyframes = plan_keyframes(schedule, 2)
+    assert keyframes[-1] == frames - 1
+    assert min(gaps(schedule, keyframes), default=1) >= 0.5 - 1e-9
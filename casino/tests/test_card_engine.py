@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from card_engine import (
+    CARD_LABELS, DECK_SIZE, RANKS, SUITS, Hand, Shoe,
+    dealer_draws, format_hand, hand_value, round_delta, round_outcome,
+)
+
+def card(rank: str, suit: int = 0) -> int:
+    return RANKS.index(rank) * len(SUITS) + suit
+
+@pytest.mark.parametrize("ranks, total, soft", [
+    (("A",), 11, True),
+    (("A", "K"), 21, True),
+    (("A", "A"), 12, True),
+    (("A", "A", "9"), 21, True),
+    (("A", "6", "K"), 17, False),
+    (("A", "A", "A", "A"), 14, True),
+    (("K", "Q", "2"), 22, False),
+    (("5", "5", "A", "A"), 12, False),
+])
+def test_hand_totals(ranks, total, soft):
+    hand = Hand(card(rank) for rank in ranks)
+    assert hand.total == total
+    assert hand.soft is soft
+    assert hand_value(hand) == total
+    assert hand_value(hand.cards) == total
+
+def test_adding_cards_matches_a_fresh_count():
+    rng = random.Random(7)
+    for _ in range(200):
+        cards = [rng.randrange(DECK_SIZE) for _ in range(rng.randint(1, 8))]
+        hand = Hand()
+        for c in cards:
+            hand.add(c)
+        assert hand.total == Hand(cards).total
+
+def test_format_hand_hides_the_hole_card():
+    hand = Hand([card("A", 0), card("K", 1)])
+    assert format_hand(hand) == f"{CARD_LABELS[card('A', 0)]} | {CARD_LABELS[card('K', 1)]}"
+    assert format_hand(hand, hide_second_card=True) == f"{CARD_LABELS[card('A', 0)]} | ❓"
+
+@pytest.mark.parametrize("player, dealer, outcome", [
+    (22, 17, "bust"),
+    (22, 22, "bust"),
+    (21, 22, "bonus"),
+    (21, 20, "bonus"),
+    (20, 22, "win"),
+    (19, 18, "win"),
+    (21, 21, "draw"),
+    (18, 18, "draw"),
+    (17, 18, "lose"),
+])
+def test_round_outcome(player, dealer, outcome):
+    assert round_outcome(player, dealer) == outcome
+
+@pytest.mark.parametrize("outcome, delta", [
+    ("bonus", 500), ("win", 100), ("draw", 0), ("lose", -100), ("bust", -100),
+])
+def test_round_delta(outcome, delta):
+    assert round_delta(outcome, 100) == delta
+
+def test_dealer_draws_only_while_behind():
+    assert dealer_draws(Hand([card("K"), card("6")]), 17)
+    assert not dealer_draws(Hand([card("K"), card("7")]), 17)
+    assert not dealer_draws(Hand([card("A"), card("K")]), 21)
+
+def test_shoe_reshuffles_at_the_cut_card():
+    shoe = Shoe(decks=1, penetration=0.5, rng=random.Random(1))
+    dealt = [shoe.draw() for _ in range(DECK_SIZE // 2)]
+    assert sorted(dealt + [shoe.draw() for _ in range(shoe.remaining)]) == list(range(DECK_SIZE))
+    shoe.start_round()
+    assert shoe.shuffles == 2
+    assert shoe.remaining == DECK_SIZE
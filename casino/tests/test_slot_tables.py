@@ -0,0 +1,18 @@
+import pytest
+
+from slot_tables import BET_BONUS, SYMBOL_COEFFICIENTS, spin_payout
+
+def test_losing_spin_costs_the_bet():
+    assert spin_payout(["🍒", "🍒", "🍋"], 100) == (False, 0, -100, 1)
+
+@pytest.mark.parametrize("symbol", list(SYMBOL_COEFFICIENTS))
+@pytest.mark.parametrize("bet", [50, 100, 500, 1000])
+def test_winning_spin(symbol, bet):
+    bonus = BET_BONUS.get(bet, 1)
+    win = int(bet * SYMBOL_COEFFICIENTS[symbol] * bonus)
+    assert spin_payout([symbol] * 3, bet) == (True, win, win - bet, bonus)
+
+def test_bet_bonus():
+    assert spin_payout(["🍀"] * 3, 50)[1] == 500
+    assert spin_payout(["🍀"] * 3, 1000)[1] == 40000
+    assert spin_payout(["🍒"] * 3, 100)[1] == 300
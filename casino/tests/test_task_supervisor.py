@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+
+import task_supervisor
+
+@pytest.fixture(autouse=True)
+def supervisor(monkeypatch):
+    # drain() stops the module from accepting work; give each test a fresh one
+    monkeypatch.setattr(task_supervisor, "_tasks", {})
+    monkeypatch.setattr(task_supervisor, "_critical", set())
+    monkeypatch.setattr(task_supervisor, "_accepting", True)
+
+def test_drain_waits_for_critical_tasks():
+    async def run():
+        done = []
+
+        async def settle():
+            await asyncio.sleep(0.05)
+            done.append("settled")
+
+        task_supervisor.spawn("slots", settle(), critical=True)
+        assert await task_supervisor.drain(1.0)
+        return done
+
+    assert asyncio.run(run()) == ["settled"]
+
+def test_drain_gives_up_at_the_deadline():
+    async def run():
+        cancelled = []
+
+        async def stuck():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        task_supervisor.spawn("slots", stuck(), critical=True)
+        start = time.monotonic()
+        finished = await task_supervisor.drain(0.1)
+        return finished, time.monotonic() - start, cancelled
+
+    finished, elapsed, cancelled = asyncio.run(run())
+    assert not finished
+    assert 0.1 <= elapsed < 1.0
+    assert cancelled == [True]
+
+def test_drain_cancels_non_critical_tasks_without_waiting():
+    async def run():
+        task = task_supervisor.spawn("wheel_of_fortune", asyncio.sleep(60))
+        start = time.monotonic()
+        finished = await task_supervisor.drain(5.0)
+        return finished, time.monotonic() - start, task
+
+    finished, elapsed, task = asyncio.run(run())
+    assert finished
+    assert elapsed < 1.0
+    assert task.cancelled()
+
+def test_no_new_tasks_after_drain():
+    async def run():
+        await task_supervisor.drain(0)
+        return task_supervisor.spawn("slots", asyncio.sleep(0))
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+import metrics
+
+# --- Per-user serialized executor ---
+# Every balance-affecting step for a user runs through that user's queue, one
+# at a time. A user's queue and worker are created on first use and evicted
+# after USER_IDLE_TIMEOUT seconds without activity, so memory is bounded by
+# the number of recently active users rather than everyone ever seen.
+
+USER_IDLE_TIMEOUT = float(os.getenv("USER_IDLE_TIMEOUT", "300"))  # seconds
+
+executor_stats = {
+    "actors_created": 0,
+    "evictions": 0,
+    "steps_run": 0,
+    "steps_waited": 0,  # steps that had to queue behind another one
+    "total_wait_ms": 0.0,
+    "max_wait_ms": 0.0,
+}
+
+class _UserActor:
+    __slots__ = ("queue", "worker", "busy", "last_used", "last_action")
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+        self.worker = None
+        self.busy = False
+        self.last_used = time.monotonic()
+        self.last_action = 0.0
+
+_actors = {}
+
+# Steps submitted and not yet finished, across all users; drain() waits for 0
+_pending_steps = 0
+_idle = None  # asyncio.Event set while _pending_steps == 0
+
+# Optional async context manager factory wrapped around every step, e.g. a
+# cross-process user lock (see coordination.py). None means no extra guard.
+_step_guard = None
+
+def set_step_guard(guard):
+    global _step_guard
+    _step_guard = guard
+
+async def _run_step(uid, fn, args, kwargs):
+    if _step_guard is None:
+        return await fn(*args, **kwargs)
+    async with _step_guard(uid):
+        return await fn(*args, **kwargs)
+
+def _get_actor(uid: int) -> _UserActor:
+    actor = _actors.get(uid)
+    if actor is None:
+        actor = _actors[uid] = _UserActor()
+        executor_stats["actors_created"] += 1
+    if actor.worker is None or actor.worker.done():
+        actor.worker = asyncio.create_task(_run_actor(uid, actor))
+    actor.last_used = time.monotonic()
+    return actor
+
+async def submit(uid: int, fn, *args, **kwargs):
+    """Run `await fn(*args, **kwargs)` in the user's queue and return its result.
+
+    Steps must not submit to the same user's queue themselves (that would deadlock).
+    """
+    global _pending_steps
+    actor = _get_actor(uid)
+    if actor.busy or not actor.queue.empty():
+        executor_stats["steps_waited"] += 1
+    future = asyncio.get_running_loop().create_future()
+    actor.queue.put_nowait((fn, args, kwargs, future, time.monotonic()))
+    _pending_steps += 1
+    if _idle is not None:
+        _idle.clear()
+    return await future
+
+def _step_done():
+    global _pending_steps
+    _pending_steps -= 1
+    if _pending_steps == 0 and _idle is not None:
+        _idle.set()
+
+async def drain(timeout: float) -> bool:
+    """
+    Wait up to `timeout` seconds until no step is running or queued in any
+    user's queue, so settles in progress finish before shutdown. Returns
+    True if the queues went idle.
+    """
+    global _idle
+    if _pending_steps == 0:
+        return True
+    if _idle is None:
+        _idle = asyncio.Event()
+    print(f"⏳ Waiting up to {timeout:.0f}s for {_pending_steps} queued game step(s)", flush=True)
+    try:
+        await asyncio.wait_for(_idle.wait(), timeout)
+    except asyncio.TimeoutError:
+        print(f"⚠️ {_pending_steps} game step(s) were still queued or running at shutdown", flush=True)
+        return False
+    return True
+
+async def _run_actor(uid: int, actor: _UserActor):
+    while True:
+        try:
+            fn, args, kwargs, future, queued_at = await asyncio.wait_for(
+                actor.queue.get(), USER_IDLE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            if actor.queue.empty() and time.monotonic() - actor.last_used >= USER_IDLE_TIMEOUT:
+                if _actors.get(uid) is actor:
+                    del _actors[uid]
+                    executor_stats["evictions"] += 1
+                return
+            continue
+
+        if future.cancelled():
+            # The caller gave up before the step started
+            _step_done()
+            continue
+
+        wait_ms = (time.monotonic() - queued_at) * 1000
+        executor_stats["total_wait_ms"] += wait_ms
+        executor_stats["max_wait_ms"] = max(executor_stats["max_wait_ms"], wait_ms)
+
+        actor.busy = True
+        try:
+            result = await _run_step(uid, fn, args, kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            actor.busy = False
+            actor.last_used = time.monotonic()
+            executor_stats["steps_run"] += 1
+            _step_done()
+
+def can_act(uid: int, cooldown: float) -> bool:
+    """Per-user cooldown; the timestamp lives with the user's actor and is evicted with it."""
+    actor = _get_actor(uid)
+    now = time.time()
+    if now - actor.last_action < cooldown:
+        return False
+    actor.last_action = now
+    return True
+
+def user_queue_depth(uid: int) -> int:
+    actor = _actors.get(uid)
+    if actor is None:
+        return 0
+    return actor.queue.qsize() + (1 if actor.busy else 0)
+
+def get_executor_stats() -> dict:
+    stats = dict(executor_stats)
+    stats["active_users"] = len(_actors)
+    stats["queued_steps"] = sum(a.queue.qsize() for a in _actors.values())
+    stats["max_user_depth"] = max((user_queue_depth(uid) for uid in _actors), default=0)
+    stats["avg_wait_ms"] = stats["total_wait_ms"] / stats["steps_run"] if stats["steps_run"] else 0.0
+    return stats
+
+metrics.register_gauge("casino_executor_active_users", "Users with a live executor queue", lambda: len(_actors))
+metrics.register_gauge(
+    "casino_executor_queued_steps", "Steps waiting in user queues",
+    lambda: sum(a.queue.qsize() for a in _actors.values())
+)
@@ -1,13 +1,21 @@
 import discord
+import os
 import random
-import asyncio
-from database import get_pool, get_balance, update_balance, get_user_lock
-from my_logginng import db_log
+from database import get_balance, get_wheel_state, settle_game
+from user_executor import submit
+from coordination import get_coordinator
+from animation import play, ease_out_schedule
+from metrics import InstrumentedView, counted_edit
 
 wheel_of_fortune = [100, '@', -10, 15, -20, '@', -50, '@', 10, -15, 20, '@']
-active_wheel_spins = set() # set to control active spins so users cannot spam
+WHEEL_SESSION_TTL = 120  # seconds; only matters if a process dies mid-spin
+WHEEL_SPIN_SECONDS = float(os.getenv("WHEEL_SPIN_SECONDS", "10"))  # how long a spin animates, however far it goes
 
 def embed_wheel(i):
+    return discord.Embed(title="Wheel of Fortune 🎯", description=_WHEEL_FRAMES[i % len(wheel_of_fortune)], color=0xFFD700)
+
+def wheel_frame(i):
+    """The wheel's ASCII art with position i under the pointer (built from scratch)."""
     def fmt(val):
         return str(val).center(3) 
     desc = f"""
@@ -25,106 +33,97 @@ def embed_wheel(i):
 {fmt(wheel_of_fortune[(i+4)%len(wheel_of_fortune)])}    /   |   \\    {fmt(wheel_of_fortune[(i+8)%len(wheel_of_fortune)])}
       {fmt(wheel_of_fortune[(i+5)%len(wheel_of_fortune)])}  |   {fmt(wheel_of_fortune[(i+7)%len(wheel_of_fortune)])}             
           {fmt(wheel_of_fortune[(i+6)%len(wheel_of_fortune)])}"""
-    
-    embed = discord.Embed(title="Wheel of Fortune 🎯", description=f"```{desc}```", color=0xFFD700)
-    return embed
+    return f"```{desc}```"
+
+# Only len(wheel_of_fortune) distinct frames exist; their text is built once at import
+_WHEEL_FRAMES = tuple(wheel_frame(i) for i in range(len(wheel_of_fortune)))
 
 def round_up_to_50(x: int) -> int:
     return ((x + 49) // 50) * 50
 
-async def get_wheel_state(user_id: int) -> int:
-    async with get_pool().acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT wheel_state FROM user_accounts WHERE user_id = $1",
-            user_id
-        )
-        return row['wheel_state'] if row else 0  # default to 0 if missing
+# Runs in the user's queue: check the balance, pick the result and settle it.
+# Settling before the animation means a dismissed message can't skip the result.
+async def _draw_and_settle(uid, username, bet):
+    bal, _ = await get_balance(uid, username)
+    if bal < bet:
+        return None
 
-async def update_wheel_state(user_id: int, state: int):
-    async with get_pool().acquire() as conn:
-        await conn.execute(
-            "UPDATE user_accounts SET wheel_state = $1 WHERE user_id = $2",
-            state, user_id
-        )
+    wheel_state = await get_wheel_state(uid)
+
+    full_rotations = random.randint(2, 4)
+    offset = random.randint(0, len(wheel_of_fortune) - 1)
+    winner = full_rotations * len(wheel_of_fortune) + offset
+    final_index = (wheel_state + winner) % len(wheel_of_fortune)
+    result = wheel_of_fortune[final_index]
+
+    win_amount_delta = 0
+    bet_amount_delta = 0
+
+    if result == '@':
+        msg_text = f"You hit {result}. Spin again!"
+    else:
+        win_amount_delta = round_up_to_50(bal * result // 100)
+        if (win_amount_delta <= 0):
+            bet_amount_delta = abs(win_amount_delta)
+            msg_text = f"You lost {result}% of your current balance🥲: {win_amount_delta}."
+        else:
+            msg_text = f"You won {result}% of your current balance🤑: {win_amount_delta}."
+
+    # Stores the wheel position, applies the result and logs it in one round trip
+    await settle_game(
+        uid, username, "wheel_of_fortune", "fortune_wheel_spin", win_amount_delta, 0,
+        total_bet_delta=bet_amount_delta,
+        wheel_state=final_index,
+        metadata={"result": result, "final_index": final_index},
+        clamp=True
+    )
+    return wheel_state, winner, final_index, msg_text
 
 async def spin_wheel_logic(interaction: discord.Interaction, bet=1000, view=None):
     uid = interaction.user.id
 
-    if uid in active_wheel_spins:
+    # One active spin per user so users cannot spam
+    coordinator = get_coordinator()
+    if not await coordinator.claim_session("wheel_of_fortune", uid, WHEEL_SESSION_TTL):
         await interaction.followup.send(
             "⚠️ You are already spinning the wheel!", ephemeral=True
         )
         return
-    active_wheel_spins.add(uid)
-
-    lock = get_user_lock(uid)
-
-    async with lock:
-        bal, _ = await get_balance(uid, interaction.user.name)
-        if bal < bet:
-            if interaction.response.is_done():
-                await interaction.followup.send(f"❌ Not enough coins! You need at least {bet}.", ephemeral=True)
-            else:
-                await interaction.response.send_message(f"❌ Not enough coins! You need at least {bet}.", ephemeral=True)
-            return
-        
-        wheel_state = await get_wheel_state(uid)
-
-    await interaction.edit_original_response(embed=embed_wheel(wheel_state), view=view)
-
-    full_rotations = random.randint(2, 4)
-    offset = random.randint(0, len(wheel_of_fortune) - 1)
-    winner = full_rotations * len(wheel_of_fortune) + offset
-    final_index = (wheel_state + winner) % len(wheel_of_fortune)
-
-    for step in range(winner+1):
-        pos = (step + wheel_state) % len(wheel_of_fortune)
-        delay = 0.05 + ((step / winner)**3)
-        await asyncio.sleep(delay)
-        try:
-            await interaction.edit_original_response(embed=embed_wheel(pos), view=view)
-        except discord.errors.NotFound:
-            return
-
-    async with lock:
-        await update_wheel_state(uid, final_index)
-        result = wheel_of_fortune[final_index]
-
-        win_amount_delta = 0
-        bet_amount_delta = 0
+    try:
+        await _spin_wheel(interaction, uid, bet, view)
+    finally:
+        await coordinator.release_session("wheel_of_fortune", uid)
+
+async def _spin_wheel(interaction, uid, bet, view):
+    spin = await submit(uid, _draw_and_settle, uid, interaction.user.name, bet)
+    if spin is None:
+        if interaction.response.is_done():
+            await interaction.followup.send(f"❌ Not enough coins! You need at least {bet}.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"❌ Not enough coins! You need at least {bet}.", ephemeral=True)
+        return
+    wheel_state, winner, final_index, msg_text = spin
 
-        if result == '@':
-            msg_text = f"You hit {result}. Spin again!"
+    # Frame `step` shows the wheel `step` positions further; the last one carries the result
+    async def show_frame(step):
+        if step == winner:
+            embed = embed_wheel(final_index)
+            embed.add_field(name="Result", value=msg_text, inline=False)
         else:
-            win_amount_delta = round_up_to_50(bal * result // 100)
-            if (win_amount_delta <= 0):
-                bet_amount_delta = abs(win_amount_delta)
-                msg_text = f"You lost {result}% of your current balance🥲: {win_amount_delta}."
-            else:
-                msg_text = f"You won {result}% of your current balance🤑: {win_amount_delta}."
-
-        await update_balance(uid, win_amount_delta, bet_amount_delta)
-        # logs
-        bal, total_bet = await get_balance(uid, interaction.user.name)
-        await db_log(
-            user_id=uid,
-            username=interaction.user.name,
-            source="wheel_of_fortune",
-            action="fortune_wheel_spin",
-            bet_amount=0,
-            delta=win_amount_delta,
-            balance_after=bal,
-            total_bet_after=total_bet,
-            metadata={"result": result, "final_index": final_index}
-        )
+            embed = embed_wheel((step + wheel_state) % len(wheel_of_fortune))
+        await counted_edit(interaction.edit_original_response(embed=embed, view=view))
+
+    # Same cubic slow-down as before, stretched over a fixed duration
+    schedule = ease_out_schedule(winner + 1, WHEEL_SPIN_SECONDS)
+    try:
+        await play(show_frame, schedule)
+    except discord.errors.NotFound:
+        return
 
-    final_embed = embed_wheel(final_index)
-    final_embed.add_field(name="Result", value=msg_text, inline=False)
-    await interaction.edit_original_response(embed=final_embed, view=view)
-    active_wheel_spins.discard(uid)
 
+class FortuneView(InstrumentedView):
+    game = "wheel_of_fortune"
 
-class FortuneView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=600)
 
@@ -132,14 +131,14 @@ class FortuneView(discord.ui.View):
     async def spin(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Disable the button to prevent multiple clicks
         button.disabled = True
-        await interaction.response.edit_message(view=self)  # FIRST response
+        await counted_edit(interaction.response.edit_message(view=self))  # FIRST response
 
         # Run the spin logic (which includes defer and animations)
         await spin_wheel_logic(interaction, view=self)
 
         # Re-enable the button after the spin
         button.disabled = False
-        await interaction.edit_original_response(view=self)
+        await counted_edit(interaction.edit_original_response(view=self))
 
     @discord.ui.button(label="Check Balance", style=discord.ButtonStyle.primary, custom_id="wheel_check")
     async def check(self, interaction, button: discord.ui.Button):